@@ -1,8 +1,39 @@
+import csv
 import sqlite3
-import pandas as pd
-from datetime import datetime
 import os
-import streamlit as st
+from itertools import islice
+from db_connection import INDEX_SQL, SUMMARY_RESEED_SQL, SUMMARY_SQL, SUMMARY_TABLES, SUMMARY_TRIGGERS, get_connection
+
+# I use PyArrow's multi-threaded CSV reader when it's installed, and fall back to the csv module otherwise
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+# I only memory-map CSVs from this size up - for small files a plain read is just as fast
+_MMAP_THRESHOLD = 1 << 20
+
+# I fix each table's column order here so the INSERT statements are built once, not for every chunk
+_COLUMNS = {
+    'providers': ('Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact'),
+    'receivers': ('Receiver_ID', 'Name', 'Type', 'City', 'Contact'),
+    'food_listings': ('Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID',
+                      'Provider_Type', 'Location', 'Food_Type', 'Meal_Type'),
+    'claims': ('Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp')
+}
+# Reusing the exact same SQL text lets sqlite3 hit its statement cache instead of re-parsing
+_INSERT_SQL = {
+    table: f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    for table, columns in _COLUMNS.items()
+}
+# Without Arrow I read plain strings, so these per-column casters give each value its proper type
+_CASTERS = {
+    'providers': (int, str, str, str, str, str),
+    'receivers': (int, str, str, str, str),
+    'food_listings': (int, str, int, str, int, str, str, str, str),
+    'claims': (int, int, int, str, str)
+}
 
 class DatabaseSetup:
     def __init__(self, db_path="database/food_waste.db"):
@@ -14,9 +45,8 @@ class DatabaseSetup:
     def create_connection(self):
         """I created this method to handle database connections safely"""
         try:
-            # I'm establishing a connection to my SQLite database
-            conn = sqlite3.connect(self.db_path)
-            return conn
+            # I'm reusing the cached, already-tuned connection for my SQLite database
+            return get_connection(self.db_path)
         except sqlite3.Error as e:
             # I'm adding error handling to catch connection issues early
             print(f"Error creating connection: {e}")
@@ -31,8 +61,11 @@ class DatabaseSetup:
         try:
             cursor = conn.cursor()
             
-            # I'm creating the Providers table - this stores all food suppliers in my system
-            cursor.execute('''
+            # I'm creating all four tables in a single transaction so the schema costs one fsync, not four
+            cursor.executescript('''
+                BEGIN IMMEDIATE;
+                
+                -- Providers table - this stores all food suppliers in my system
                 CREATE TABLE IF NOT EXISTS providers (
                     Provider_ID INTEGER PRIMARY KEY,
                     Name TEXT NOT NULL,
@@ -40,22 +73,18 @@ class DatabaseSetup:
                     Address TEXT,
                     City TEXT NOT NULL,
                     Contact TEXT
-                )
-            ''')
-            
-            # I'm creating the Receivers table - stores organizations and individuals who need food
-            cursor.execute('''
+                );
+                
+                -- Receivers table - stores organizations and individuals who need food
                 CREATE TABLE IF NOT EXISTS receivers (
                     Receiver_ID INTEGER PRIMARY KEY,
                     Name TEXT NOT NULL,
                     Type TEXT NOT NULL,
                     City TEXT NOT NULL,
                     Contact TEXT
-                )
-            ''')
-            
-            # I'm creating the Food Listings table - the heart of my system
-            cursor.execute('''
+                );
+                
+                -- Food Listings table - the heart of my system
                 CREATE TABLE IF NOT EXISTS food_listings (
                     Food_ID INTEGER PRIMARY KEY,
                     Food_Name TEXT NOT NULL,
@@ -67,11 +96,9 @@ class DatabaseSetup:
                     Food_Type TEXT,
                     Meal_Type TEXT,
                     FOREIGN KEY (Provider_ID) REFERENCES providers (Provider_ID)
-                )
-            ''')
-            
-            # I'm creating the Claims table - tracks who takes what food
-            cursor.execute('''
+                );
+                
+                -- Claims table - tracks who takes what food
                 CREATE TABLE IF NOT EXISTS claims (
                     Claim_ID INTEGER PRIMARY KEY,
                     Food_ID INTEGER,
@@ -80,21 +107,17 @@ class DatabaseSetup:
                     Timestamp DATETIME,
                     FOREIGN KEY (Food_ID) REFERENCES food_listings (Food_ID),
                     FOREIGN KEY (Receiver_ID) REFERENCES receivers (Receiver_ID)
-                )
+                );
+                
+                COMMIT;
             ''')
-            
-            # I'm committing all table creations in one transaction
-            conn.commit()
             print("✅ Tables created successfully!")
             
         except sqlite3.Error as e:
             # I'm catching any SQL errors during table creation
             raise Exception(f"Error creating tables: {e}")
-        finally:
-            # I always close the connection to prevent resource leaks
-            conn.close()
     
-    def load_csv_data(self):
+    def load_csv_data(self, progress_callback=None, commit_every=50000):
         """I built this method to populate my database with initial data from CSV files"""
         conn = self.create_connection()
         if conn is None:
@@ -109,34 +132,194 @@ class DatabaseSetup:
                 'claims': 'data/claims_data.csv'
             }
             
-            for table_name, file_path in csv_files.items():
-                if not os.path.exists(file_path):
-                    raise Exception(f"CSV file not found: {file_path}")
+            # I stat every file once up front - it's my existence check and it gives me the sizes for the reader
+            try:
+                file_sizes = {table_name: os.stat(file_path).st_size for table_name, file_path in csv_files.items()}
+            except FileNotFoundError as e:
+                raise Exception(f"CSV file not found: {e.filename}")
             
-            # I'm loading providers data from CSV
-            providers_df = pd.read_csv('data/providers_data.csv')
-            providers_df.to_sql('providers', conn, if_exists='replace', index=False)
+            cursor = conn.cursor()
             
-            # I'm loading receivers data
-            receivers_df = pd.read_csv('data/receivers_data.csv')
-            receivers_df.to_sql('receivers', conn, if_exists='replace', index=False)
+            # When SQLite's csv extension is available the files are parsed and copied entirely inside SQLite
+            use_csv_extension = self.load_csv_extension(conn)
             
-            # I'm loading food listings
-            food_listings_df = pd.read_csv('data/food_listings_data.csv')
-            food_listings_df.to_sql('food_listings', conn, if_exists='replace', index=False)
+            # I'm turning off fsync for the bulk load - the CSVs are the source of truth if it's interrupted
+            conn.execute("PRAGMA synchronous=OFF")
+            # I skip per-row foreign key lookups while loading and check them all in one pass afterwards
+            # (this has to happen outside the transaction, SQLite ignores it inside one)
+            conn.execute("PRAGMA foreign_keys=OFF")
             
-            # I'm loading claims data
-            claims_df = pd.read_csv('data/claims_data.csv')
-            claims_df.to_sql('claims', conn, if_exists='replace', index=False)
+            # I load in large transactions and commit every `commit_every` rows, so a big ingest doesn't pile up
+            # dirty pages in one giant transaction and the caller's progress display keeps moving
+            cursor.execute("BEGIN IMMEDIATE")
+            # I drop the summary triggers first so the reload doesn't fire them row by row -
+            # create_summary_table recreates them and reseeds the rollups once the data is in
+            for trigger_name in SUMMARY_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+            # I also empty the summary tables (on a first setup they don't exist yet), so their old totals can't
+            # outlive the data they described - the next start then sees them as stale and reseeds them
+            existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for summary_table in SUMMARY_TABLES:
+                if summary_table in existing:
+                    cursor.execute(f"DELETE FROM {summary_table}")
+            uncommitted_rows = 0
+            for table_name, file_path in csv_files.items():
+                # I clear the table instead of replacing it so the keys and indexes from create_tables stay intact -
+                # an unqualified DELETE also lets SQLite use its truncate optimization rather than deleting row by row
+                cursor.execute(f"DELETE FROM {table_name}")
+                
+                if use_csv_extension:
+                    rows_loaded = self.import_csv_natively(cursor, table_name, file_path)
+                    if progress_callback:
+                        progress_callback(table_name, rows_loaded)
+                    continue
+                
+                # I stream each CSV in chunks and batch-insert them - far faster than row-by-row inserts
+                rows_loaded = 0
+                for columns, rows in self.read_csv_batches(table_name, file_path, file_sizes[table_name]):
+                    # I make sure the CSV header lines up with the prepared INSERT before binding by position
+                    if tuple(columns) != _COLUMNS[table_name]:
+                        raise Exception(f"Unexpected columns in {file_path}: {', '.join(columns)}")
+                    cursor.executemany(_INSERT_SQL[table_name], rows)
+                    rows_loaded += cursor.rowcount
+                    uncommitted_rows += cursor.rowcount
+                    
+                    if uncommitted_rows >= commit_every:
+                        conn.commit()
+                        cursor.execute("BEGIN IMMEDIATE")
+                        uncommitted_rows = 0
+                    if progress_callback:
+                        progress_callback(table_name, rows_loaded)
+            conn.commit()
             
             print("✅ Data loaded successfully!")
             
         except Exception as e:
+            # I'm rolling back whatever the current batch had written when the load failed
+            conn.rollback()
             # I'm handling any errors during data loading
             raise Exception(f"Error loading data: {e}")
         finally:
-            # I always ensure the connection is closed
-            conn.close()
+            # The connection is shared, so I put durability back to normal once the load is over
+            conn.execute("PRAGMA synchronous=NORMAL")
+    
+    def load_csv_extension(self, conn):
+        """I try to load SQLite's csv virtual-table extension and report whether it's available"""
+        # Some Python builds are compiled without extension loading at all
+        if not hasattr(conn, "enable_load_extension"):
+            return False
+        try:
+            conn.enable_load_extension(True)
+            conn.load_extension("csv")
+            return True
+        except sqlite3.Error:
+            # The extension isn't part of every SQLite install, so I quietly fall back to reading in Python
+            return False
+        finally:
+            # I switch loading back off straight away so nothing else can pull in extensions on this connection
+            conn.enable_load_extension(False)
+    
+    def import_csv_natively(self, cursor, table_name, file_path):
+        """I use the csv virtual table so SQLite parses and inserts the file without a Python round-trip per row"""
+        virtual_table = f"temp.csv_{table_name}"
+        escaped_path = file_path.replace("'", "''")
+        # The csv module reads every field as text, so I turn empty fields into NULL like the other readers do
+        columns = ", ".join(_COLUMNS[table_name])
+        values = ", ".join(f"NULLIF({column}, '')" for column in _COLUMNS[table_name])
+        
+        cursor.execute(f"CREATE VIRTUAL TABLE {virtual_table} USING csv(filename='{escaped_path}', header=YES)")
+        try:
+            # Selecting the columns by name means a CSV with a different header fails loudly here
+            cursor.execute(f"INSERT INTO {table_name} ({columns}) SELECT {values} FROM {virtual_table}")
+            return cursor.rowcount
+        finally:
+            cursor.execute(f"DROP TABLE {virtual_table}")
+    
+    def read_csv_batches(self, table_name, file_path, file_size=0, chunk_size=20000):
+        """I wrote this generator to hand each CSV to SQLite as (column names, row tuples) batches"""
+        if pacsv is not None:
+            # Arrow tokenizes the file on several threads into columnar buffers - my addresses span lines, so I allow that
+            options = dict(
+                read_options=pacsv.ReadOptions(block_size=1 << 20),
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+            )
+            if file_size >= _MMAP_THRESHOLD:
+                # For big files I let Arrow parse straight out of a memory map instead of copying the file in
+                with pa.memory_map(file_path) as source:
+                    table = pacsv.read_csv(source, **options)
+            else:
+                table = pacsv.read_csv(file_path, **options)
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                # I turn the columns back into row tuples, which is the shape executemany expects
+                yield batch.schema.names, zip(*(column.to_pylist() for column in batch.columns))
+        else:
+            with open(file_path, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                casters = _CASTERS[table_name]
+                # The csv module already hands me tuples of strings - I only cast them, with None for blank fields
+                rows = (
+                    tuple(cast(value) if value != '' else None for cast, value in zip(casters, row))
+                    for row in reader
+                )
+                while batch := list(islice(rows, chunk_size)):
+                    yield header, batch
+    
+    def create_indexes(self):
+        """I added this to index the columns my queries filter and join on - SQLite doesn't index foreign keys itself"""
+        conn = self.create_connection()
+        if conn is None:
+            raise Exception("Could not connect to database")
+        
+        try:
+            # I build these after the bulk load so SQLite sorts each index once instead of updating it per row
+            conn.executescript(INDEX_SQL)
+            # I refresh the planner statistics now that the data and indexes are in, so SQLite knows which index to pick
+            conn.execute("ANALYZE")
+            print("✅ Indexes created successfully!")
+            
+        except sqlite3.Error as e:
+            # I'm catching any SQL errors during index creation
+            raise Exception(f"Error creating indexes: {e}")
+
+    def create_summary_table(self):
+        """I set up the trigger-maintained dashboard_summary table once the data and indexes are in place"""
+        conn = self.create_connection()
+        if conn is None:
+            raise Exception("Could not connect to database")
+        
+        try:
+            # The script also reseeds the totals from the freshly loaded rows
+            conn.executescript(SUMMARY_SQL)
+            # The data has just been (re)loaded, so I always reseed here
+            conn.executescript(SUMMARY_RESEED_SQL)
+            print("✅ Dashboard summary created successfully!")
+            
+        except sqlite3.Error as e:
+            raise Exception(f"Error creating dashboard summary: {e}")
+
+    def check_foreign_keys(self):
+        """I validate all foreign keys in one batch pass after the load instead of row by row during it"""
+        conn = self.create_connection()
+        if conn is None:
+            raise Exception("Could not connect to database")
+        
+        try:
+            # I switch enforcement back on for everything that happens after the load
+            conn.execute("PRAGMA foreign_keys=ON")
+            violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+            
+            if violations:
+                # The data is already committed, so I report the broken references rather than failing the setup
+                print(f"⚠️ Found {len(violations)} rows with foreign keys that point at missing records")
+            else:
+                print("✅ Foreign keys verified!")
+            return violations
+            
+        except sqlite3.Error as e:
+            # I'm catching any SQL errors during the integrity check
+            raise Exception(f"Error checking foreign keys: {e}")
 
 # This is where I run the database setup when the script is executed directly
 if __name__ == "__main__":
@@ -145,8 +328,14 @@ if __name__ == "__main__":
         db_setup = DatabaseSetup()
         # I run table creation first
         db_setup.create_tables()
-        # Then I load all the CSV data
-        db_setup.load_csv_data()
+        # Then I load all the CSV data, printing how far each table has got
+        db_setup.load_csv_data(progress_callback=lambda table, rows: print(f"  ⏳ {table}: {rows:,} rows loaded"))
+        # I add the indexes after the load, once all the rows are in place
+        db_setup.create_indexes()
+        # I build the dashboard summary next - its triggers rely on the provider index
+        db_setup.create_summary_table()
+        # Finally I check referential integrity once, now that every table is loaded
+        db_setup.check_foreign_keys()
         print("🎉 Database setup completed!")
     except Exception as e:
         print(f"❌ Database setup failed: {e}")
\ No newline at end of file
@@ -1,31 +1,46 @@
+import csv
+import gzip
 import sqlite3
-import pandas as pd
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from db_connection import get_connection
 
 class DatabaseUtils:
+    # I build my SQL text once when the class is defined, so each call is just a lookup instead of a format
+    _TABLES = ('providers', 'receivers', 'food_listings', 'claims')
+    _SELECT_ALL = {table: f"SELECT * FROM {table}" for table in _TABLES}
+    _COUNT_ALL = "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {table})" for table in _TABLES)
+    
     def __init__(self, db_path="database/food_waste.db"):
         # I'm setting up the path to my database - keeping it consistent with my main app
         self.db_path = db_path
     
-    def backup_database(self, backup_path=None):
+    def backup_database(self, backup_path=None, compress=False):
         """I created this method to protect my data - backups are essential for any real system"""
         if backup_path is None:
             # I'm generating a timestamp-based filename so I never overwrite previous backups
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = f"food_waste_backup_{timestamp}.db"
+            extension = "sql.gz" if compress else "db"
+            backup_path = f"food_waste_backup_{timestamp}.{extension}"
         
         try:
-            # I'm connecting to my original database to read from it
-            conn_orig = sqlite3.connect(self.db_path)
-            
-            # I'm creating a new database file for the backup
-            conn_backup = sqlite3.connect(backup_path)
-            # I use SQLite's built-in backup method - it's more reliable than manual copying
-            conn_orig.backup(conn_backup)
+            # I'm reusing the shared connection to my original database to read from it
+            conn_orig = get_connection(self.db_path)
             
-            # I always close connections properly to avoid corruption
-            conn_orig.close()
-            conn_backup.close()
+            if compress:
+                # I dump the database as SQL text into a gzip file - far smaller than a raw page copy
+                with gzip.open(backup_path, "wt", encoding="utf-8") as f:
+                    for line in conn_orig.iterdump():
+                        f.write(f"{line}\n")
+            else:
+                # I'm creating a new database file for the backup
+                conn_backup = sqlite3.connect(backup_path)
+                # I use SQLite's built-in backup method, copying 1024 pages per step with a short pause
+                # between steps so the read lock is released and writers aren't blocked for the whole copy
+                conn_orig.backup(conn_backup, pages=1024, sleep=0.0025)
+                
+                # I close the backup file's connection - the shared one stays open for the next call
+                conn_backup.close()
             
             print(f"✅ Database backed up to: {backup_path}")
             return backup_path
@@ -37,39 +52,40 @@ class DatabaseUtils:
     def get_database_stats(self):
         """I built this method to give me insights into my database health and usage"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             
             # I'm using a dictionary to organize all my statistics
             stats = {}
             
-            # I'm getting row counts for all my main tables - this shows system usage
-            tables = ['providers', 'receivers', 'food_listings', 'claims']
-            for table in tables:
-                df = pd.read_sql_query(f"SELECT COUNT(*) as count FROM {table}", conn)
-                stats[f"{table}_count"] = df.iloc[0]['count']
+            # I'm getting row counts for all my main tables in one round-trip - this shows system usage
+            row = conn.execute(self._COUNT_ALL).fetchone()
+            for table, count in zip(self._TABLES, row):
+                stats[f"{table}_count"] = count
+            
+            # I read the aggregate rows as sqlite3.Row so they turn into dicts without going through pandas -
+            # the row factory goes on this cursor only, because the connection itself is shared
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             
             # I'm calculating food-specific statistics to understand inventory patterns
-            food_stats = pd.read_sql_query("""
+            stats['food_stats'] = dict(cursor.execute("""
                 SELECT 
                     SUM(Quantity) as total_quantity,    -- Total food available
                     AVG(Quantity) as avg_quantity,      -- Average listing size
                     MIN(Quantity) as min_quantity,      -- Smallest listing
                     MAX(Quantity) as max_quantity       -- Largest listing
                 FROM food_listings
-            """, conn)
-            stats['food_stats'] = food_stats.to_dict('records')[0]
+            """).fetchone())
             
             # I'm analyzing claim patterns to understand success rates
-            claim_stats = pd.read_sql_query("""
+            stats['claim_stats'] = [dict(row) for row in cursor.execute("""
                 SELECT 
                     Status,
                     COUNT(*) as count
                 FROM claims
                 GROUP BY Status
-            """, conn)
-            stats['claim_stats'] = claim_stats.to_dict('records')
+            """)]
             
-            conn.close()
             return stats
         except Exception as e:
             # I return empty dict on error so the calling code doesn't break
@@ -79,29 +95,48 @@ class DatabaseUtils:
     def clean_expired_food(self):
         """I implemented this for database maintenance - expired food shouldn't clutter the system"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
             
-            # I first count expired items so I can report how many were removed
-            cursor.execute("SELECT COUNT(*) FROM food_listings WHERE Expiry_Date < date('now')")
-            expired_count = cursor.fetchone()[0]
+            # I work out today's date once in Python - a bound constant lets SQLite range-scan idx_food_expiry
+            # instead of evaluating date('now') for every row
+            today = date.today().isoformat()
+            
+            # I delete expired items and count them in the same statement, so the table is only scanned once
+            cursor.execute("DELETE FROM food_listings WHERE Expiry_Date < ? RETURNING Food_ID", (today,))
+            expired_count = len(cursor.fetchall())
+            conn.commit()
             
             if expired_count > 0:
-                # I delete expired food items to keep the database clean
-                cursor.execute("DELETE FROM food_listings WHERE Expiry_Date < date('now')")
-                conn.commit()
                 print(f"✅ Removed {expired_count} expired food items")
             else:
                 # I give positive feedback when there's nothing to clean
                 print("✅ No expired food items found")
             
-            conn.close()
             return expired_count
         except Exception as e:
             # I return 0 on error so the calling code gets a sensible default
             print(f"❌ Error cleaning expired food: {e}")
             return 0
     
+    def export_table_to_csv(self, table, file_path):
+        """I split out the single-table export so each table can be written on its own thread"""
+        # Each worker opens its own connection - in WAL mode SQLite lets these readers run side by side
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.execute(self._SELECT_ALL[table])
+            # I stream rows from the cursor in batches so a whole table never sits in memory at once
+            with open(file_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                # I write the column names first, the same header the DataFrame export used to produce
+                writer.writerow([column[0] for column in cursor.description])
+                while chunk := cursor.fetchmany(10000):
+                    writer.writerows(chunk)
+            return file_path
+        finally:
+            # These are one-off connections, so I close them rather than caching them
+            conn.close()
+    
     def export_data_to_csv(self, output_dir="exports"):
         """I created this method for data portability - users might want to analyze data elsewhere"""
         import os
@@ -110,23 +145,19 @@ class DatabaseUtils:
             # I create the output directory if it doesn't exist - prevents path errors
             os.makedirs(output_dir, exist_ok=True)
             
-            conn = sqlite3.connect(self.db_path)
-            
             # I export all main tables for complete data backup
-            tables = ['providers', 'receivers', 'food_listings', 'claims']
-            exported_files = []
-            
-            for table in tables:
-                # I read each table completely into a DataFrame
-                df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-                # I create descriptive filenames with table names
-                file_path = os.path.join(output_dir, f"{table}_export.csv")
-                # I export without index to keep CSV clean
-                df.to_csv(file_path, index=False)
-                exported_files.append(file_path)
+            tables = self._TABLES
+            # I create descriptive filenames with table names
+            file_paths = [os.path.join(output_dir, f"{table}_export.csv") for table in tables]
+            
+            # The tables don't depend on each other, so I scan and write them in parallel -
+            # SQLite and file I/O release the GIL, which lets the threads overlap
+            with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+                exported_files = list(executor.map(self.export_table_to_csv, tables, file_paths))
+            
+            for table, file_path in zip(tables, exported_files):
                 print(f"✅ Exported {table} to {file_path}")
             
-            conn.close()
             return exported_files
         except Exception as e:
             # I return empty list on error so calling code can handle gracefully
@@ -0,0 +1,233 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+# I keep a few read-only connections per database so independent reports can run side by side under WAL
+READ_POOL_SIZE = 4
+
+# I keep the index definitions here so the setup script and the app build exactly the same ones
+INDEX_SQL = """
+    BEGIN;
+    CREATE INDEX IF NOT EXISTS idx_food_expiry ON food_listings(Expiry_Date);
+    CREATE INDEX IF NOT EXISTS idx_food_provider ON food_listings(Provider_ID);
+    CREATE INDEX IF NOT EXISTS idx_food_filter ON food_listings(Location, Food_Type, Meal_Type);
+    CREATE INDEX IF NOT EXISTS idx_claims_food ON claims(Food_ID);
+    CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims(Receiver_ID);
+    CREATE INDEX IF NOT EXISTS idx_claims_status ON claims(Status);
+    CREATE INDEX IF NOT EXISTS idx_providers_city ON providers(City);
+    CREATE INDEX IF NOT EXISTS idx_receivers_city ON receivers(City);
+    COMMIT;
+"""
+
+# I keep the dashboard's food totals and group rollups in small summary tables that triggers maintain on every
+# write, so reading the KPIs and city/type/status breakdowns never scans food_listings or claims
+SUMMARY_SQL = """
+    BEGIN;
+    CREATE TABLE IF NOT EXISTS dashboard_summary (
+        key TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    );
+    
+    -- Each insert adds its row and quantity, and counts its provider if this is their first listing
+    CREATE TRIGGER IF NOT EXISTS trg_food_summary_insert AFTER INSERT ON food_listings
+    BEGIN
+        UPDATE dashboard_summary SET value = value + 1 WHERE key = 'total_items';
+        UPDATE dashboard_summary SET value = value + NEW.Quantity WHERE key = 'total_qty';
+        UPDATE dashboard_summary SET value = value + 1 WHERE key = 'active_providers'
+            AND NEW.Provider_ID IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM food_listings WHERE Provider_ID = NEW.Provider_ID AND Food_ID <> NEW.Food_ID);
+    END;
+    
+    -- Each delete takes its row and quantity back out, and drops its provider once they have no listings left
+    CREATE TRIGGER IF NOT EXISTS trg_food_summary_delete AFTER DELETE ON food_listings
+    BEGIN
+        UPDATE dashboard_summary SET value = value - 1 WHERE key = 'total_items';
+        UPDATE dashboard_summary SET value = value - OLD.Quantity WHERE key = 'total_qty';
+        UPDATE dashboard_summary SET value = value - 1 WHERE key = 'active_providers'
+            AND OLD.Provider_ID IS NOT NULL
+            AND NOT EXISTS (SELECT 1 FROM food_listings WHERE Provider_ID = OLD.Provider_ID);
+    END;
+    
+    -- An update can change the quantity, or move a listing from one provider to another
+    CREATE TRIGGER IF NOT EXISTS trg_food_summary_update AFTER UPDATE OF Quantity, Provider_ID ON food_listings
+    BEGIN
+        UPDATE dashboard_summary SET value = value + NEW.Quantity - OLD.Quantity WHERE key = 'total_qty';
+        UPDATE dashboard_summary SET value = value - 1 WHERE key = 'active_providers'
+            AND OLD.Provider_ID IS NOT NULL AND OLD.Provider_ID IS NOT NEW.Provider_ID
+            AND NOT EXISTS (SELECT 1 FROM food_listings WHERE Provider_ID = OLD.Provider_ID);
+        UPDATE dashboard_summary SET value = value + 1 WHERE key = 'active_providers'
+            AND NEW.Provider_ID IS NOT NULL AND OLD.Provider_ID IS NOT NEW.Provider_ID
+            AND NOT EXISTS (SELECT 1 FROM food_listings WHERE Provider_ID = NEW.Provider_ID AND Food_ID <> NEW.Food_ID);
+    END;
+    
+    -- I keep the per-city, per-food-type and per-status rollups as small tables too, so queries 6, 7 and 10 read
+    -- one row per group instead of grouping the base tables. A group's row goes away when its last member does,
+    -- and keys are compared with IS so a NULL City, Food_Type or Status is a group of its own, like GROUP BY makes it
+    CREATE TABLE IF NOT EXISTS mv_city_listings (
+        City TEXT PRIMARY KEY,
+        Total_Listings INTEGER NOT NULL,
+        Total_Quantity INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS mv_food_type_counts (
+        Food_Type TEXT PRIMARY KEY,
+        Total_Items INTEGER NOT NULL,
+        Total_Quantity INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS mv_status_counts (
+        Status TEXT PRIMARY KEY,
+        Count INTEGER NOT NULL
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS trg_food_rollup_insert AFTER INSERT ON food_listings
+    BEGIN
+        UPDATE mv_city_listings SET Total_Listings = Total_Listings + 1, Total_Quantity = Total_Quantity + NEW.Quantity
+            WHERE City IS NEW.Location;
+        INSERT INTO mv_city_listings (City, Total_Listings, Total_Quantity) SELECT NEW.Location, 1, NEW.Quantity
+            WHERE NOT EXISTS (SELECT 1 FROM mv_city_listings WHERE City IS NEW.Location);
+        UPDATE mv_food_type_counts SET Total_Items = Total_Items + 1, Total_Quantity = Total_Quantity + NEW.Quantity
+            WHERE Food_Type IS NEW.Food_Type;
+        INSERT INTO mv_food_type_counts (Food_Type, Total_Items, Total_Quantity) SELECT NEW.Food_Type, 1, NEW.Quantity
+            WHERE NOT EXISTS (SELECT 1 FROM mv_food_type_counts WHERE Food_Type IS NEW.Food_Type);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_food_rollup_delete AFTER DELETE ON food_listings
+    BEGIN
+        UPDATE mv_city_listings SET Total_Listings = Total_Listings - 1, Total_Quantity = Total_Quantity - OLD.Quantity
+            WHERE City IS OLD.Location;
+        DELETE FROM mv_city_listings WHERE City IS OLD.Location AND Total_Listings = 0;
+        UPDATE mv_food_type_counts SET Total_Items = Total_Items - 1, Total_Quantity = Total_Quantity - OLD.Quantity
+            WHERE Food_Type IS OLD.Food_Type;
+        DELETE FROM mv_food_type_counts WHERE Food_Type IS OLD.Food_Type AND Total_Items = 0;
+    END;
+    
+    -- An update takes the old row out of its groups and adds the new row to its own
+    CREATE TRIGGER IF NOT EXISTS trg_food_rollup_update AFTER UPDATE OF Quantity, Location, Food_Type ON food_listings
+    BEGIN
+        UPDATE mv_city_listings SET Total_Listings = Total_Listings - 1, Total_Quantity = Total_Quantity - OLD.Quantity
+            WHERE City IS OLD.Location;
+        DELETE FROM mv_city_listings WHERE City IS OLD.Location AND Total_Listings = 0;
+        UPDATE mv_food_type_counts SET Total_Items = Total_Items - 1, Total_Quantity = Total_Quantity - OLD.Quantity
+            WHERE Food_Type IS OLD.Food_Type;
+        DELETE FROM mv_food_type_counts WHERE Food_Type IS OLD.Food_Type AND Total_Items = 0;
+        UPDATE mv_city_listings SET Total_Listings = Total_Listings + 1, Total_Quantity = Total_Quantity + NEW.Quantity
+            WHERE City IS NEW.Location;
+        INSERT INTO mv_city_listings (City, Total_Listings, Total_Quantity) SELECT NEW.Location, 1, NEW.Quantity
+            WHERE NOT EXISTS (SELECT 1 FROM mv_city_listings WHERE City IS NEW.Location);
+        UPDATE mv_food_type_counts SET Total_Items = Total_Items + 1, Total_Quantity = Total_Quantity + NEW.Quantity
+            WHERE Food_Type IS NEW.Food_Type;
+        INSERT INTO mv_food_type_counts (Food_Type, Total_Items, Total_Quantity) SELECT NEW.Food_Type, 1, NEW.Quantity
+            WHERE NOT EXISTS (SELECT 1 FROM mv_food_type_counts WHERE Food_Type IS NEW.Food_Type);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_claims_rollup_insert AFTER INSERT ON claims
+    BEGIN
+        UPDATE mv_status_counts SET Count = Count + 1 WHERE Status IS NEW.Status;
+        INSERT INTO mv_status_counts (Status, Count) SELECT NEW.Status, 1
+            WHERE NOT EXISTS (SELECT 1 FROM mv_status_counts WHERE Status IS NEW.Status);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_claims_rollup_delete AFTER DELETE ON claims
+    BEGIN
+        UPDATE mv_status_counts SET Count = Count - 1 WHERE Status IS OLD.Status;
+        DELETE FROM mv_status_counts WHERE Status IS OLD.Status AND Count = 0;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_claims_rollup_update AFTER UPDATE OF Status ON claims
+    BEGIN
+        UPDATE mv_status_counts SET Count = Count - 1 WHERE Status IS OLD.Status;
+        DELETE FROM mv_status_counts WHERE Status IS OLD.Status AND Count = 0;
+        UPDATE mv_status_counts SET Count = Count + 1 WHERE Status IS NEW.Status;
+        INSERT INTO mv_status_counts (Status, Count) SELECT NEW.Status, 1
+            WHERE NOT EXISTS (SELECT 1 FROM mv_status_counts WHERE Status IS NEW.Status);
+    END;
+    
+    COMMIT;
+"""
+
+# I reseed the totals and rollups from the tables themselves, so they're right even for rows written before the
+# triggers existed. This rewrites the summary tables, so it only runs when they're new or empty (see SUMMARY_STALE_SQL)
+# or after the setup script has reloaded the data - never on every app start
+SUMMARY_RESEED_SQL = """
+    BEGIN;
+    INSERT OR REPLACE INTO dashboard_summary (key, value)
+    SELECT 'total_items', COUNT(*) FROM food_listings
+    UNION ALL SELECT 'total_qty', COALESCE(SUM(Quantity), 0) FROM food_listings
+    UNION ALL SELECT 'active_providers', COUNT(DISTINCT Provider_ID) FROM food_listings;
+    DELETE FROM mv_city_listings;
+    INSERT INTO mv_city_listings SELECT Location, COUNT(*), SUM(Quantity) FROM food_listings GROUP BY Location;
+    DELETE FROM mv_food_type_counts;
+    INSERT INTO mv_food_type_counts SELECT Food_Type, COUNT(*), SUM(Quantity) FROM food_listings GROUP BY Food_Type;
+    DELETE FROM mv_status_counts;
+    INSERT INTO mv_status_counts SELECT Status, COUNT(*) FROM claims GROUP BY Status;
+    COMMIT;
+"""
+
+# I list every trigger SUMMARY_SQL installs, so a bulk reload can drop them first - otherwise each reloaded row
+# fires its trigger, and the reload's DELETE loses the truncate optimization. create_summary_table puts them back
+SUMMARY_TRIGGERS = (
+    "trg_food_summary_insert", "trg_food_summary_delete", "trg_food_summary_update",
+    "trg_food_rollup_insert", "trg_food_rollup_delete", "trg_food_rollup_update",
+    "trg_claims_rollup_insert", "trg_claims_rollup_delete", "trg_claims_rollup_update",
+)
+# ...and the tables they maintain, which the reload empties so SUMMARY_STALE_SQL forces a reseed on the next start
+# even if the caller never gets to create_summary_table
+SUMMARY_TABLES = ("dashboard_summary", "mv_city_listings", "mv_food_type_counts", "mv_status_counts")
+
+# I check whether the summary tables still need their first seed - dashboard_summary has no keys yet, or a rollup is
+# empty while its base table has rows (a database from before the rollups were added)
+SUMMARY_STALE_SQL = """
+    SELECT NOT EXISTS (SELECT 1 FROM dashboard_summary)
+        OR (EXISTS (SELECT 1 FROM food_listings) AND NOT EXISTS (SELECT 1 FROM mv_city_listings))
+        OR (EXISTS (SELECT 1 FROM claims) AND NOT EXISTS (SELECT 1 FROM mv_status_counts))
+"""
+
+@lru_cache(maxsize=8)
+def get_connection(db_path):
+    """I keep one connection per database file so SQLite's page cache survives between calls"""
+    # I allow the connection to be shared across threads - Streamlit runs each session on its own thread.
+    # I also make the statement cache big enough for every static query in the app (the analytical reports,
+    # the filter variants and the CRUD statements), so repeat runs skip SQLite's parser and planner
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+    # I'm tuning the connection once here instead of every time a method needs the database. Each commit is then
+    # a WAL append, and I pin the checkpoint interval at 1000 pages rather than trusting the build's default
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA wal_autocheckpoint=1000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+    """)
+    return conn
+
+@lru_cache(maxsize=8)
+def get_lock(db_path):
+    """I hand out one lock per database file so threads take turns on its shared connection"""
+    return threading.Lock()
+
+@lru_cache(maxsize=8)
+def get_read_pool(db_path):
+    """I open READ_POOL_SIZE read-only connections once and hand them out through a queue"""
+    pool = queue.Queue()
+    for _ in range(READ_POOL_SIZE):
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        # I switch on query_only last, so these connections can never write even by mistake
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA query_only=1;
+        """)
+        pool.put(conn)
+    return pool
+
+@contextmanager
+def read_connection(db_path):
+    """I check a pooled reader out for the length of a with block and always put it back"""
+    pool = get_read_pool(db_path)
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
@@ -1,10 +1,63 @@
+import os
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from sql_queries import SQLQueries
-import sqlite3
+from db_connection import INDEX_SQL, SUMMARY_RESEED_SQL, SUMMARY_SQL, SUMMARY_STALE_SQL, get_connection, get_lock
 from datetime import datetime, date
+from itertools import product
+
+# I keep the database path in one place so every form writes to the same file
+DB_PATH = "database/food_waste.db"
+
+# I keep the food listing INSERT in one place so the single-item form and the bulk CSV upload share it
+FOOD_COLUMNS = ("Food_Name", "Quantity", "Expiry_Date", "Provider_ID", "Provider_Type", "Location", "Food_Type", "Meal_Type")
+FOOD_INSERT_SQL = f"INSERT INTO food_listings ({', '.join(FOOD_COLUMNS)}) VALUES ({', '.join('?' * len(FOOD_COLUMNS))})"
+
+# These are my app's pages, in the order the sidebar lists them
+PAGES = (
+    "🏠 Home Dashboard",      # My main overview page with key metrics
+    "📊 Analytics & Reports", # I wanted detailed analysis capabilities
+    "🔍 Search & Filter",     # Essential for users to find specific data
+    "📝 Food Management",     # For managing current food inventory
+    "📈 All SQL Queries",     # I included this to showcase all my analytical queries
+    "📋 CRUD Operations",     # Full database management functionality I built
+)
+
+# I define my selectbox options once as tuples, so reruns reuse the same objects instead of rebuilding lists
+CITIES = ("Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad")
+CITIES_WITH_ALL = ("All", *CITIES)
+CITIES_WITH_KEEP = ("Keep Current", *CITIES)
+FOOD_TYPES = ("Vegetarian", "Non-Vegetarian", "Vegan")
+FOOD_TYPES_WITH_ALL = ("All", *FOOD_TYPES)
+MEAL_TYPES = ("Breakfast", "Lunch", "Dinner", "Snacks")
+MEAL_TYPES_WITH_ALL = ("All", *MEAL_TYPES)
+PROVIDER_TYPES = ("Restaurant", "Grocery Store", "Supermarket")
+CLAIM_STATUSES = ("Pending", "Completed", "Cancelled")
+LISTING_STATUSES = ("Keep Current", "Available", "Claimed", "Expired")
+# I cap filter results at one page of rows - nobody reads more than this at once
+FILTER_PAGE_SIZE = 500
+# These are the columns the food filter can narrow on, in the order their parameters are bound
+FILTER_COLUMNS = ("Food_Type", "Meal_Type", "Location")
+
+def _build_filter_sql():
+    """I prepare the count and page statements for every combination of active filters up front"""
+    statements = {}
+    for mask in product((False, True), repeat=len(FILTER_COLUMNS)):
+        conditions = [f"{column} = ?" for column, active in zip(FILTER_COLUMNS, mask) if active]
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        statements[mask] = (
+            f"SELECT COUNT(*) AS Matches FROM food_listings{where}",
+            "SELECT Food_ID, Food_Name, Quantity, Expiry_Date, Location, Food_Type, Meal_Type "
+            f"FROM food_listings{where} ORDER BY Food_ID LIMIT ? OFFSET ?",
+        )
+    return statements
+
+# I look the filter SQL up by which filters are active, so each click reuses the exact same statement text
+# and SQLite's statement cache can skip re-parsing it
+FILTER_SQL = _build_filter_sql()
+# I show the full listings table a page at a time so its render cost doesn't grow with the table
+LISTINGS_PAGE_SIZE = 100
 
 
 # I'm configuring the page layout to make my app look professional
@@ -15,37 +68,98 @@ st.set_page_config(
     initial_sidebar_state="expanded"  # I want the navigation to be visible by default
 )
 
+@st.cache_resource
+def check_database(db_path=DB_PATH):
+    """I look for the database file once per process instead of on every rerun"""
+    # A missing file raises instead of returning False - Streamlit doesn't cache exceptions, so the check runs
+    # again on the next rerun and picks the database up as soon as the setup script has created it
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    return True
+
+@st.cache_resource
+def get_db_conn(db_path=DB_PATH):
+    """I share one SQLite connection across reruns and sessions instead of reopening it on every submit"""
+    # The connection is shared, so I never change its row_factory or other state from the forms
+    conn = get_connection(db_path)
+    # I make sure the indexes my filters and joins rely on exist, even on a database built before they were added,
+    # and the dashboard summary table and its triggers after them - the triggers look providers up by index
+    conn.executescript(INDEX_SQL)
+    conn.executescript(SUMMARY_SQL)
+    # The CREATE ... IF NOT EXISTS statements write nothing once everything exists, so a restart leaves the database
+    # untouched - I only seed the summary tables when they've just been created or were never filled
+    if conn.execute(SUMMARY_STALE_SQL).fetchone()[0]:
+        conn.executescript(SUMMARY_RESEED_SQL)
+    # I gather planner statistics once for a database that has never had them - rerunning ANALYZE on every
+    # start would rewrite the database and throw away the on-disk query cache for nothing
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+        conn.execute("ANALYZE")
+    return conn
+
+# I fingerprint DataFrame arguments with one vectorized row hash instead of Streamlit's generic hasher,
+# which samples rows on big frames - shape and column names go in too, so renamed columns miss the cache
+HASH_FUNCS = {
+    pd.DataFrame: lambda df: (df.shape, tuple(df.columns), pd.util.hash_pandas_object(df, index=False).values.tobytes())
+}
+
+# I memoize my Plotly figures on the DataFrame plus the chart options, so a figure is only rebuilt
+# when the query result behind it actually changes
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs=HASH_FUNCS)
+def build_pie(df, values, names, title, colors=None):
+    """I build pie charts once per data version instead of on every rerun - colors names a qualitative palette"""
+    # I import Plotly here rather than at the top, so pages without charts never pay for loading it
+    import plotly.express as px
+    palette = getattr(px.colors.qualitative, colors) if colors else None
+    return px.pie(df, values=values, names=names, title=title, color_discrete_sequence=palette)
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs=HASH_FUNCS)
+def build_bar(df, x, y, title, color, color_scale=None):
+    """I build bar charts once per data version instead of on every rerun"""
+    import plotly.express as px
+    return px.bar(df, x=x, y=y, title=title, color=color, color_continuous_scale=color_scale)
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs=HASH_FUNCS)
+def build_scatter(df, x, y, size, color, hover_name, title):
+    """I build scatter plots once per data version instead of on every rerun"""
+    import plotly.express as px
+    return px.scatter(df, x=x, y=y, size=size, color=color, hover_name=hover_name, title=title)
+
+def rerun_fragment():
+    """I rerun just the calling fragment, or the whole app when the fragment is being drawn as part of a full run"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # Streamlit refuses a fragment-scoped rerun during a full-app run, so I fall back to a normal rerun.
+        # Either way the rerun is a BaseException, so the callers' `except Exception` blocks never swallow it
+        st.rerun()
+
 class FoodWasteApp:
     def __init__(self):
         # I'm initializing my SQL queries class to handle all database operations
-        self.sql_queries = SQLQueries()
+        self.sql_queries = SQLQueries(DB_PATH)
+        # I open the shared connection up front so its indexes exist before the first page queries
+        get_db_conn()
+        # I map each navigation label to the method that renders it
+        self.pages = dict(zip(PAGES, (
+            self.home_dashboard,
+            self.analytics_reports,
+            self.search_filter,
+            self.food_management,
+            self.all_sql_queries,
+            self.crud_operations,
+        )))
         
     def main_page(self):
         # I designed a sidebar navigation system for easy user access to different features
         st.sidebar.title("🍽️ Food Waste Management")
-        page = st.sidebar.selectbox("Navigate to:", [
-            "🏠 Home Dashboard",      # My main overview page with key metrics
-            "📊 Analytics & Reports", # I wanted detailed analysis capabilities
-            "🔍 Search & Filter",     # Essential for users to find specific data
-            "📝 Food Management",     # For managing current food inventory
-            "📈 All SQL Queries",     # I included this to showcase all my analytical queries
-            "📋 CRUD Operations"      # Full database management functionality I built
-        ])
+        # I bind the navigation straight to session_state, so the current page survives every rerun
+        st.session_state.setdefault("page", PAGES[0])
+        st.sidebar.radio("Navigate to:", PAGES, key="page")
         
-        # I'm routing users to different pages based on their selection
-        if page == "🏠 Home Dashboard":
-            self.home_dashboard()
-        elif page == "📊 Analytics & Reports":
-            self.analytics_reports()
-        elif page == "🔍 Search & Filter":
-            self.search_filter()
-        elif page == "📝 Food Management":
-            self.food_management()
-        elif page == "📈 All SQL Queries":
-            self.all_sql_queries()
-        elif page == "📋 CRUD Operations":
-            self.crud_operations()
+        # I'm routing users to the selected page with one dict lookup instead of an if/elif chain
+        self.pages[st.session_state.page]()
     
+    @st.fragment
     def home_dashboard(self):
         st.title("🍽️ Local Food Wastage Management System")
         st.markdown("---")
@@ -53,34 +167,35 @@ class FoodWasteApp:
         # I'm creating a 4-column layout for key performance indicators
         col1, col2, col3, col4 = st.columns(4)
         
-        # I'm fetching data from my custom SQL queries to display real-time metrics
-        total_food = self.sql_queries.query_5_total_food_quantity()
-        city_stats = self.sql_queries.query_6_city_food_listings()
+        # I'm fetching all the dashboard's data in one cached batch to display real-time metrics
+        bundle = self.sql_queries.dashboard_bundle()
+        total_food = bundle["kpi"]
+        city_stats = bundle["city"]
         
         # I'm displaying total food items metric - this gives users immediate insight
         with col1:
-            if not total_food.empty:
+            if total_food:
                 st.metric(
                     "Total Food Items", 
-                    f"{total_food.iloc[0]['Total_Food_Items']:,}",
+                    f"{total_food['Total_Food_Items']:,}",
                     help="Total number of food items listed"  # I added helpful tooltips for users
                 )
         
         # Total quantity metric - shows the scale of food available
         with col2:
-            if not total_food.empty:
+            if total_food:
                 st.metric(
                     "Total Quantity", 
-                    f"{total_food.iloc[0]['Total_Available_Quantity']:,} units",
+                    f"{total_food['Total_Available_Quantity']:,} units",
                     help="Total quantity of food available"
                 )
         
         # Active providers count - shows ecosystem health
         with col3:
-            if not total_food.empty:
+            if total_food:
                 st.metric(
                     "Active Providers", 
-                    f"{total_food.iloc[0]['Active_Providers']:,}",
+                    f"{total_food['Active_Providers']:,}",
                     help="Number of active food providers"
                 )
         
@@ -101,17 +216,17 @@ class FoodWasteApp:
         # Left column: Provider type distribution - I chose a pie chart to show proportions clearly
         with col1:
             st.subheader("📊 Provider Type Distribution")
-            provider_data = self.sql_queries.query_2_provider_type_contribution()
+            provider_data = bundle["provider"]
             if not provider_data.empty:
                 # I'm using Plotly for interactive charts that users can hover over
-                fig = px.pie(
+                fig = build_pie(
                     provider_data, 
                     values='Total_Quantity', 
                     names='Provider_Type',
                     title="Food Quantity by Provider Type",
-                    color_discrete_sequence=px.colors.qualitative.Set3  # I picked nice colors
+                    colors="Set3"  # I picked nice colors
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, width="stretch")
             else:
                 st.info("No provider data available")
         
@@ -120,41 +235,50 @@ class FoodWasteApp:
             st.subheader("🏙️ City-wise Food Distribution")
             if not city_stats.empty:
                 # I chose a bar chart with color gradient to make it visually appealing
-                fig = px.bar(
+                fig = build_bar(
                     city_stats, 
                     x='City', 
                     y='Total_Quantity',
                     title="Food Availability by City",
                     color='Total_Quantity',
-                    color_continuous_scale='viridis'  # This color scale looks professional
+                    color_scale='viridis'  # This color scale looks professional
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, width="stretch")
             else:
                 st.info("No city data available")
         
         # I'm adding an alerts section to highlight urgent items
+        self.recent_alerts()
+    
+    @st.fragment(run_every="60s")
+    def recent_alerts(self):
+        # I keep the alerts in their own fragment so they refresh every minute without redrawing the KPI row
         st.subheader("🚨 Recent Alerts")
+        # The alerts batch is cached, so this is a lookup unless the cache has expired since the last run
+        alerts = self.sql_queries.alerts_bundle()
         col1, col2 = st.columns(2)
         
         # Left alert: Expiring food - this is critical for preventing waste
         with col1:
             st.write("**⏰ Expiring Soon**")
-            expiring_food = self.sql_queries.query_14_expiring_food()
+            expiring_food = alerts["expiring"]
             if not expiring_food.empty:
-                # I'm showing only top 3 to keep the dashboard clean
-                st.dataframe(expiring_food.head(3), use_container_width=True)
+                # I'm showing only top 3 to keep the dashboard clean - a static table is plenty for that,
+                # without the interactive grid st.dataframe would mount for three rows
+                st.table(expiring_food.head(3))
             else:
                 st.success("No food expiring soon!")
         
         # Right alert: Unclaimed food - shows available opportunities
         with col2:
             st.write("**📦 Unclaimed Food**")
-            unclaimed_food = self.sql_queries.query_15_unclaimed_food()
+            unclaimed_food = alerts["unclaimed"]
             if not unclaimed_food.empty:
-                st.dataframe(unclaimed_food.head(3), use_container_width=True)
+                st.table(unclaimed_food.head(3))
             else:
                 st.success("All food has been claimed!")
     
+    @st.fragment
     def analytics_reports(self):
         st.header("📊 Analytics & Reports")
         
@@ -167,16 +291,16 @@ class FoodWasteApp:
             food_types = self.sql_queries.query_7_common_food_types()
             if not food_types.empty:
                 # I used a bar chart with color coding for better visual impact
-                fig = px.bar(
+                fig = build_bar(
                     food_types, 
                     x='Food_Type', 
                     y='Total_Quantity',
                     title="Food Quantity by Type",
                     color='Percentage'  # Color represents percentage for quick insights
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, width="stretch")
                 # I also show the raw data table for users who want details
-                st.dataframe(food_types, use_container_width=True)
+                st.dataframe(food_types, width="stretch")
         
         # Performance tab - I wanted to show provider effectiveness
         with tab2:
@@ -184,7 +308,7 @@ class FoodWasteApp:
             provider_performance = self.sql_queries.query_9_successful_providers()
             if not provider_performance.empty:
                 # I chose a scatter plot to show the relationship between claims and success rate
-                fig = px.scatter(
+                fig = build_scatter(
                     provider_performance,
                     x='Total_Claims',
                     y='Success_Rate_Percent',
@@ -193,8 +317,8 @@ class FoodWasteApp:
                     hover_name='Name',  # I added hover for provider names
                     title="Provider Success Rate vs Total Claims"
                 )
-                st.plotly_chart(fig, use_container_width=True)
-                st.dataframe(provider_performance, use_container_width=True)
+                st.plotly_chart(fig, width="stretch")
+                st.dataframe(provider_performance, width="stretch")
         
         # Summary tab - High-level overview of claim statuses
         with tab3:
@@ -202,21 +326,22 @@ class FoodWasteApp:
             status_data = self.sql_queries.query_10_claim_status_distribution()
             if not status_data.empty:
                 # Pie chart is perfect for showing status distribution
-                fig = px.pie(
+                fig = build_pie(
                     status_data,
                     values='Count',
                     names='Status',
                     title="Distribution of Claim Status"
                 )
-                st.plotly_chart(fig, use_container_width=True)
-                st.dataframe(status_data, use_container_width=True)
+                st.plotly_chart(fig, width="stretch")
+                st.dataframe(status_data, width="stretch")
     
+    @st.fragment
     def search_filter(self):
         st.header("🔍 Search & Filter")
         
         # I created a city-based provider search first - most common use case
         st.subheader("🏙️ Search Providers by City")
-        cities = st.selectbox("Select City:", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad"])
+        cities = st.selectbox("Select City:", CITIES)
         
         if st.button("🔍 Search Providers"):
             # I'm calling my custom query to find providers in the selected city
@@ -224,7 +349,7 @@ class FoodWasteApp:
             if not providers.empty:
                 # I show count and results for user feedback
                 st.success(f"Found {len(providers)} providers in {cities}")
-                st.dataframe(providers, use_container_width=True)
+                st.dataframe(providers, width="stretch")
             else:
                 st.warning(f"No providers found in {cities}")
         
@@ -236,39 +361,40 @@ class FoodWasteApp:
         
         # Three-column filter layout for better user experience
         with col1:
-            food_type_filter = st.selectbox("Food Type:", ["All", "Vegetarian", "Non-Vegetarian", "Vegan"])
+            food_type_filter = st.selectbox("Food Type:", FOOD_TYPES_WITH_ALL)
         with col2:
-            meal_type_filter = st.selectbox("Meal Type:", ["All", "Breakfast", "Lunch", "Dinner", "Snacks"])
+            meal_type_filter = st.selectbox("Meal Type:", MEAL_TYPES_WITH_ALL)
         with col3:
-            city_filter = st.selectbox("Location:", ["All", "Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad"])
+            city_filter = st.selectbox("Location:", CITIES_WITH_ALL)
         
         if st.button("🔍 Apply Filters"):
-            # I'm building dynamic SQL based on user selections - this was a key challenge I solved
-            query = "SELECT * FROM food_listings WHERE 1=1"
-            params = []
-            
-            # I'm adding conditions only when user selects specific filters
-            if food_type_filter != "All":
-                query += " AND Food_Type = ?"
-                params.append(food_type_filter)
-            
-            if meal_type_filter != "All":
-                query += " AND Meal_Type = ?"
-                params.append(meal_type_filter)
+            # I remember the filters as they were when applied, so the page control below survives its own reruns
+            # and changing a selectbox does nothing until the button is clicked again
+            st.session_state["food_filter_applied"] = (food_type_filter, meal_type_filter, city_filter)
+            st.session_state["food_filter_page"] = 1
+        
+        selected = st.session_state.get("food_filter_applied")
+        if selected:
+            # I pick the prepared SQL for the applied filters and bind only their values
+            count_sql, page_sql = FILTER_SQL[tuple(value != "All" for value in selected)]
+            params = [value for value in selected if value != "All"]
             
-            if city_filter != "All":
-                query += " AND Location = ?"
-                params.append(city_filter)
+            # I count the matches first so I can page through them instead of loading them all
+            count = self.sql_queries.execute_query(count_sql, params if params else None)
+            matches = int(count.iloc[0]['Matches']) if not count.empty else 0
             
-            # I execute the dynamic query with parameters for security
-            filtered_data = self.sql_queries.execute_query(query, params if params else None)
-            
-            if not filtered_data.empty:
-                st.success(f"Found {len(filtered_data)} matching food items")
-                st.dataframe(filtered_data, use_container_width=True)
+            if matches:
+                st.success(f"Found {matches} matching food items")
+                pages = -(-matches // FILTER_PAGE_SIZE)
+                page = st.number_input("Page", min_value=1, max_value=pages, key="food_filter_page")
+                
+                # I execute the query with parameters for security, selecting only the columns I display
+                filtered_data = self.sql_queries.execute_query(page_sql, params + [FILTER_PAGE_SIZE, (page - 1) * FILTER_PAGE_SIZE])
+                st.dataframe(filtered_data, width="stretch")
             else:
                 st.warning("No food items match the selected criteria")
     
+    @st.fragment
     def food_management(self):
         st.header("📝 Food Management")
         
@@ -279,16 +405,24 @@ class FoodWasteApp:
         with tab1:
             st.subheader("📦 All Food Listings")
             
-            # I'm ordering by expiry date so urgent items appear first
-            all_food = self.sql_queries.execute_query("SELECT * FROM food_listings ORDER BY Expiry_Date ASC")
-            if not all_food.empty:
-                st.dataframe(all_food, use_container_width=True)
+            count = self.sql_queries.execute_query("SELECT COUNT(*) AS Listings FROM food_listings")
+            listings = int(count.iloc[0]['Listings']) if not count.empty else 0
+            if listings:
+                pages = -(-listings // LISTINGS_PAGE_SIZE)
+                page = st.number_input("Page", min_value=1, max_value=pages, key="food_listings_page")
                 
-                # I added CSV download functionality for data export
-                csv = all_food.to_csv(index=False)
+                # I'm ordering by expiry date so urgent items appear first, and only fetching the page on screen
+                page_food = self.sql_queries.execute_query(
+                    "SELECT * FROM food_listings ORDER BY Expiry_Date ASC, Food_ID LIMIT ? OFFSET ?",
+                    [LISTINGS_PAGE_SIZE, (page - 1) * LISTINGS_PAGE_SIZE]
+                )
+                st.dataframe(page_food, width="stretch", hide_index=True, height=400)
+                st.caption(f"Page {page} of {pages} · {listings:,} listings")
+                
+                # I added CSV download functionality for data export - the file still covers every listing
                 st.download_button(
                     label="📥 Download CSV",
-                    data=csv,
+                    data=self.sql_queries.export_query_csv("SELECT * FROM food_listings ORDER BY Expiry_Date ASC"),
                     file_name=f"food_listings_{datetime.now().strftime('%Y%m%d')}.csv",  # I include date in filename
                     mime="text/csv"
                 )
@@ -297,51 +431,58 @@ class FoodWasteApp:
         
         # Alerts tab - critical information for immediate action
         with tab2:
+            # I share the dashboard's cached alerts batch, so switching between the two pages hits memory
+            alerts = self.sql_queries.alerts_bundle()
             col1, col2 = st.columns(2)
             
             # Left: Expiring food alerts
             with col1:
                 st.subheader("⏰ Expiring Food Items")
-                expiring = self.sql_queries.query_14_expiring_food()
+                expiring = alerts["expiring"]
                 if not expiring.empty:
-                    st.dataframe(expiring, use_container_width=True)
+                    st.dataframe(expiring, width="stretch")
                 else:
                     st.success("No food expiring soon!")
             
             # Right: Unclaimed food opportunities
             with col2:
                 st.subheader("📦 Unclaimed Food")
-                unclaimed = self.sql_queries.query_15_unclaimed_food()
+                unclaimed = alerts["unclaimed"]
                 if not unclaimed.empty:
-                    st.dataframe(unclaimed, use_container_width=True)
+                    st.dataframe(unclaimed, width="stretch")
                 else:
                     st.success("All food has been claimed!")
     
+    @st.fragment
     def all_sql_queries(self):
         st.header("📈 All SQL Query Results")
         st.markdown("Complete analysis with all 15 SQL queries")
         
-        # I'm displaying results from all my analytical queries
-        all_results = self.sql_queries.get_all_queries_results()
-        
-        # I use expanders to keep the page organized - users can open what interests them
-        for query_title, result_df in all_results.items():
-            with st.expander(f"📊 {query_title}", expanded=False):
+        # I use expanders to keep the page organized - users can open what interests them. Each expander tracks
+        # whether it's open and reruns the fragment when toggled, so a query only runs once its expander is opened.
+        # The titles come in a fixed order, so index-based keys keep each widget's identity stable across reruns
+        for i, query_title in enumerate(self.sql_queries.REPORT_TITLES):
+            expander = st.expander(f"📊 {query_title}", expanded=False, key=f"report_{i}", on_change="rerun")
+            with expander:
+                if not expander.open:
+                    continue
+                
+                result_df, csv_bytes = self.sql_queries.get_query_result(query_title)
                 if not result_df.empty:
-                    st.dataframe(result_df, use_container_width=True)
+                    st.dataframe(result_df, width="stretch")
                     
                     # I provide download capability for each query result
-                    csv = result_df.to_csv(index=False)
                     st.download_button(
                         label=f"📥 Download {query_title}",
-                        data=csv,
+                        data=csv_bytes,
                         file_name=f"{query_title.replace(':', '').replace(' ', '_').lower()}.csv",
                         mime="text/csv",
-                        key=f"download_{query_title}"  # Unique key to avoid conflicts
+                        key=f"dl_{i}"  # Unique key to avoid conflicts
                     )
                 else:
                     st.info("No data available for this query")
     
+    @st.fragment
     def crud_operations(self):
         st.header("📋 CRUD Operations")
         
@@ -363,6 +504,7 @@ class FoodWasteApp:
         elif operation == "🗑️ Delete Record":
             self.delete_record()
     
+    @st.fragment
     def view_records(self):
         st.subheader("📖 View Records")
         
@@ -373,7 +515,7 @@ class FoodWasteApp:
             # I execute a simple SELECT * query for the chosen table
             records = self.sql_queries.execute_query(f"SELECT * FROM {table}")
             if not records.empty:
-                st.dataframe(records, use_container_width=True)
+                st.dataframe(records, width="stretch")
             else:
                 st.info(f"No records found in {table} table")
     
@@ -389,6 +531,7 @@ class FoodWasteApp:
         elif table == "claims":
             self.add_claim()
     
+    @st.fragment
     def add_food_listing(self):
         st.write("**Add New Food Listing**")
         
@@ -405,10 +548,10 @@ class FoodWasteApp:
             
             # Right column: Classification and location details
             with col2:
-                provider_type = st.selectbox("Provider Type*", ["Restaurant", "Grocery Store", "Supermarket"])
-                location = st.selectbox("Location*", ["Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad"])
-                food_type = st.selectbox("Food Type*", ["Vegetarian", "Non-Vegetarian", "Vegan"])
-                meal_type = st.selectbox("Meal Type*", ["Breakfast", "Lunch", "Dinner", "Snacks"])
+                provider_type = st.selectbox("Provider Type*", PROVIDER_TYPES)
+                location = st.selectbox("Location*", CITIES)
+                food_type = st.selectbox("Food Type*", FOOD_TYPES)
+                meal_type = st.selectbox("Meal Type*", MEAL_TYPES)
             
             submitted = st.form_submit_button("➕ Add Food Item")
             
@@ -416,26 +559,49 @@ class FoodWasteApp:
                 # I validate that all required fields are filled
                 if food_name and quantity and expiry_date and provider_id:
                     try:
-                        # I open a database connection for the insert operation
-                        conn = sqlite3.connect("food_waste.db")
-                        cursor = conn.cursor()
-                        
-                        # I use parameterized queries to prevent SQL injection
-                        cursor.execute('''
-                            INSERT INTO food_listings 
-                            (Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type))
+                        # I reuse the cached connection - "with conn" commits the insert, or rolls it back on error
+                        conn = get_db_conn()
+                        with get_lock(DB_PATH), conn:
+                            # I use parameterized queries to prevent SQL injection
+                            conn.execute(FOOD_INSERT_SQL, (food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type))
                         
-                        conn.commit()
-                        conn.close()
+                        # I drop cached query results so every page picks up the new listing - nothing in this
+                        # fragment displays it, so I skip the rerun and let the success message stay on screen
+                        self.sql_queries.clear_cache()
                         st.success(f"✅ Successfully added '{food_name}' to the database!")
-                        st.experimental_rerun()  # I refresh the page to show updated data
                     except Exception as e:
                         st.error(f"❌ Error adding food item: {e}")
                 else:
                     st.error("Please fill in all required fields.")
+        
+        # I also accept a CSV of many listings - the upload sits in its own form so picking a file doesn't insert anything
+        with st.form("bulk_food_form"):
+            uploaded = st.file_uploader(f"Bulk CSV upload (columns: {', '.join(FOOD_COLUMNS)})", type="csv")
+            bulk_submitted = st.form_submit_button("📤 Import Listings")
+            
+            if bulk_submitted and uploaded is not None:
+                try:
+                    upload = pd.read_csv(uploaded)
+                    missing = [column for column in FOOD_COLUMNS if column not in upload.columns]
+                    if missing:
+                        st.error(f"❌ The CSV is missing these columns: {', '.join(missing)}")
+                    else:
+                        # I turn empty cells into None so SQLite stores NULL rather than NaN
+                        upload = upload[list(FOOD_COLUMNS)].astype(object)
+                        rows = list(upload.where(upload.notna(), None).itertuples(index=False, name=None))
+                        
+                        # I insert every row in one executemany inside a single transaction - one commit for the whole
+                        # file, and if any row fails none of them are kept
+                        conn = get_db_conn()
+                        with get_lock(DB_PATH), conn:
+                            conn.executemany(FOOD_INSERT_SQL, rows)
+                        
+                        self.sql_queries.clear_cache()
+                        st.success(f"✅ Successfully imported {len(rows):,} food listings!")
+                except Exception as e:
+                    st.error(f"❌ Error importing food listings: {e}")
     
+    @st.fragment
     def add_claim(self):
         st.write("**Add New Claim**")
         
@@ -450,29 +616,26 @@ class FoodWasteApp:
             
             # Right column: Status and timing
             with col2:
-                status = st.selectbox("Status*", ["Pending", "Completed", "Cancelled"])
+                status = st.selectbox("Status*", CLAIM_STATUSES)
                 timestamp = st.datetime_input("Timestamp*", value=datetime.now())
             
             submitted = st.form_submit_button("➕ Add Claim")
             
             if submitted:
                 try:
-                    # I noticed the database path inconsistency and am using the correct path
-                    conn = sqlite3.connect("database/food_waste.db")
-                    cursor = conn.cursor()
-                    
-                    cursor.execute('''
-                        INSERT INTO claims (Food_ID, Receiver_ID, Status, Timestamp)
-                        VALUES (?, ?, ?, ?)
-                    ''', (food_id, receiver_id, status, timestamp))
+                    conn = get_db_conn()
+                    with get_lock(DB_PATH), conn:
+                        conn.execute('''
+                            INSERT INTO claims (Food_ID, Receiver_ID, Status, Timestamp)
+                            VALUES (?, ?, ?, ?)
+                        ''', (food_id, receiver_id, status, timestamp))
                     
-                    conn.commit()
-                    conn.close()
+                    self.sql_queries.clear_cache()
                     st.success("✅ Successfully added claim to the database!")
-                    st.experimental_rerun()
                 except Exception as e:
                     st.error(f"❌ Error adding claim: {e}")
     
+    @st.fragment
     def update_record(self):
         st.subheader("✏️ Update Record")
         st.info("Select a record to update")
@@ -485,7 +648,7 @@ class FoodWasteApp:
         
         if not records.empty:
             st.write("**Current Records:**")
-            st.dataframe(records, use_container_width=True)
+            st.dataframe(records, width="stretch")
             
             # I provide specific update functions for the main tables
             if table == "food_listings":
@@ -512,15 +675,14 @@ class FoodWasteApp:
                 new_expiry = st.date_input("New Expiry Date")
             
             with col2:
-                new_status = st.selectbox("Update Status", ["Keep Current", "Available", "Claimed", "Expired"])
-                update_location = st.selectbox("New Location", ["Keep Current", "Mumbai", "Delhi", "Bangalore", "Chennai", "Hyderabad"])
+                new_status = st.selectbox("Update Status", LISTING_STATUSES)
+                update_location = st.selectbox("New Location", CITIES_WITH_KEEP)
             
             submitted = st.form_submit_button("✏️ Update Food Listing")
             
             if submitted:
                 try:
-                    conn = sqlite3.connect("food_waste.db")
-                    cursor = conn.cursor()
+                    conn = get_db_conn()
                     
                     # I build dynamic update queries based on what user wants to change
                     updates = []
@@ -541,19 +703,19 @@ class FoodWasteApp:
                     if updates:
                         params.append(food_id)
                         query = f"UPDATE food_listings SET {', '.join(updates)} WHERE Food_ID = ?"
-                        cursor.execute(query, params)
-                        conn.commit()
+                        with get_lock(DB_PATH), conn:
+                            cursor = conn.execute(query, params)
                         
                         # I check if the update actually affected any rows
                         if cursor.rowcount > 0:
+                            self.sql_queries.clear_cache()
                             st.success(f"✅ Successfully updated Food ID {food_id}!")
+                            # I rerun just the update_record fragment so its current-records table is refreshed
+                            rerun_fragment()
                         else:
                             st.warning(f"No record found with Food ID {food_id}")
                     else:
                         st.warning("No updates specified")
-                    
-                    conn.close()
-                    st.experimental_rerun()
                 except Exception as e:
                     st.error(f"❌ Error updating record: {e}")
     
@@ -563,25 +725,22 @@ class FoodWasteApp:
         # Simple form for updating claim status - the most common update operation
         with st.form("update_claim_form"):
             claim_id = st.number_input("Claim ID to Update*", min_value=1, value=1)
-            new_status = st.selectbox("New Status*", ["Pending", "Completed", "Cancelled"])
+            new_status = st.selectbox("New Status*", CLAIM_STATUSES)
             
             submitted = st.form_submit_button("✏️ Update Claim")
             
             if submitted:
                 try:
-                    conn = sqlite3.connect("food_waste.db")
-                    cursor = conn.cursor()
-                    
-                    cursor.execute("UPDATE claims SET Status = ? WHERE Claim_ID = ?", (new_status, claim_id))
-                    conn.commit()
+                    conn = get_db_conn()
+                    with get_lock(DB_PATH), conn:
+                        cursor = conn.execute("UPDATE claims SET Status = ? WHERE Claim_ID = ?", (new_status, claim_id))
                     
                     if cursor.rowcount > 0:
+                        self.sql_queries.clear_cache()
                         st.success(f"✅ Successfully updated Claim ID {claim_id} to {new_status}!")
+                        rerun_fragment()
                     else:
                         st.warning(f"No claim found with ID {claim_id}")
-                    
-                    conn.close()
-                    st.experimental_rerun()
                 except Exception as e:
                     st.error(f"❌ Error updating claim: {e}")
     
@@ -597,6 +756,7 @@ class FoodWasteApp:
         elif table == "claims":
             self.delete_claim()
     
+    @st.fragment
     def delete_food_listing(self):
         st.write("**Delete Food Listing**")
         
@@ -604,7 +764,7 @@ class FoodWasteApp:
         food_listings = self.sql_queries.execute_query("SELECT Food_ID, Food_Name, Quantity, Location FROM food_listings")
         if not food_listings.empty:
             st.write("**Current Food Listings:**")
-            st.dataframe(food_listings, use_container_width=True)
+            st.dataframe(food_listings, width="stretch")
         
         with st.form("delete_food_form"):
             food_id = st.number_input("Food ID to Delete*", min_value=1, value=1)
@@ -615,29 +775,28 @@ class FoodWasteApp:
             if submitted:
                 if confirm:
                     try:
-                        # I'm using the correct database path here
-                        conn = sqlite3.connect("database/food_waste.db")
-                        cursor = conn.cursor()
-                        
-                        # I first check if the record exists and get its name for confirmation
-                        cursor.execute("SELECT Food_Name FROM food_listings WHERE Food_ID = ?", (food_id,))
-                        result = cursor.fetchone()
+                        conn = get_db_conn()
+                        with get_lock(DB_PATH), conn:
+                            # I delete and get the name back for confirmation in one statement - RETURNING hands back
+                            # the deleted row, so an empty result means there was no such listing
+                            deleted = conn.execute(
+                                "DELETE FROM food_listings WHERE Food_ID = ? RETURNING Food_Name", (food_id,)
+                            ).fetchall()
                         
-                        if result:
-                            food_name = result[0]
-                            cursor.execute("DELETE FROM food_listings WHERE Food_ID = ?", (food_id,))
-                            conn.commit()
+                        if deleted:
+                            food_name = deleted[0][0]
+                            self.sql_queries.clear_cache()
                             st.success(f"✅ Successfully deleted '{food_name}' (ID: {food_id})")
+                            # I only rerun this fragment when something changed, so the listing above it is refreshed
+                            rerun_fragment()
                         else:
                             st.error(f"❌ No food listing found with ID {food_id}")
-                        
-                        conn.close()
-                        st.experimental_rerun()
                     except Exception as e:
                         st.error(f"❌ Error deleting record: {e}")
                 else:
                     st.error("Please confirm deletion by checking the checkbox")
     
+    @st.fragment
     def delete_claim(self):
         st.write("**Delete Claim**")
         
@@ -645,7 +804,7 @@ class FoodWasteApp:
         claims = self.sql_queries.execute_query("SELECT Claim_ID, Food_ID, Receiver_ID, Status FROM claims")
         if not claims.empty:
             st.write("**Current Claims:**")
-            st.dataframe(claims, use_container_width=True)
+            st.dataframe(claims, width="stretch")
         
         with st.form("delete_claim_form"):
             claim_id = st.number_input("Claim ID to Delete*", min_value=1, value=1)
@@ -656,22 +815,20 @@ class FoodWasteApp:
             if submitted:
                 if confirm:
                     try:
-                        conn = sqlite3.connect("food_waste.db")
-                        cursor = conn.cursor()
+                        conn = get_db_conn()
+                        with get_lock(DB_PATH), conn:
+                            # I delete and check the claim existed in one statement - RETURNING hands back the deleted
+                            # row, so an empty result means there was no such claim
+                            deleted = conn.execute(
+                                "DELETE FROM claims WHERE Claim_ID = ? RETURNING Claim_ID", (claim_id,)
+                            ).fetchall()
                         
-                        # I check if the record exists before attempting deletion
-                        cursor.execute("SELECT * FROM claims WHERE Claim_ID = ?", (claim_id,))
-                        result = cursor.fetchone()
-                        
-                        if result:
-                            cursor.execute("DELETE FROM claims WHERE Claim_ID = ?", (claim_id,))
-                            conn.commit()
+                        if deleted:
+                            self.sql_queries.clear_cache()
                             st.success(f"✅ Successfully deleted Claim ID {claim_id}")
+                            rerun_fragment()
                         else:
                             st.error(f"❌ No claim found with ID {claim_id}")
-                        
-                        conn.close()
-                        st.experimental_rerun()
                     except Exception as e:
                         st.error(f"❌ Error deleting claim: {e}")
                 else:
@@ -699,8 +856,9 @@ if __name__ == "__main__":
     """, unsafe_allow_html=True)
     
     # I'm checking if the database exists before starting the app - learned this from debugging
-    import os
-    if not os.path.exists("database/food_waste.db"):
+    try:
+        check_database()
+    except FileNotFoundError:
         st.error("❌ Database not found! Please run 'python database_setup.py' first.")
         st.stop()
     
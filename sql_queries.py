@@ -1,24 +1,391 @@
-import sqlite3
+import hashlib
+import io
+import os
+import shutil
+import time
+from datetime import datetime, timezone
 import pandas as pd
+import streamlit as st
+from db_connection import read_connection
+
+# When PyArrow is installed, query results are also persisted as Feather files so a restarted app starts warm,
+# and CSV downloads are written with its C++ writer
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.feather as feather
+except ImportError:
+    pa = pacsv = feather = None
+
+_DISK_CACHE_TTL = 600
+
+def _disk_cache_dir(db_path):
+    """Directory holding the Feather copies of query results for one database"""
+    return os.path.join(os.path.dirname(db_path) or ".", ".query_cache")
+
+def _disk_cache_path(db_path, query, params, dtype=None):
+    """Feather file path for a query, keyed on the SQL, its params, its dtypes and the database's last write"""
+    # Every commit touches the database file or its WAL, so a changed database never matches an old file
+    stamp = tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else 0 for path in (db_path, db_path + "-wal"))
+    key = hashlib.blake2b(repr((query, params, dtype, stamp)).encode(), digest_size=16).hexdigest()
+    return os.path.join(_disk_cache_dir(db_path), f"{key}.feather")
+
+def _prune_disk_cache(directory):
+    """Delete Feather files past the disk cache TTL, so rotating keys don't pile up old results"""
+    cutoff = time.time() - _DISK_CACHE_TTL
+    for entry in os.scandir(directory):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            # Another session may have removed or replaced the file first
+            pass
+
+def _utc_minute():
+    """The current UTC time to the minute, bound in place of SQLite's 'now' by the date-dependent queries"""
+    # Binding it puts the time in the cache key, and rounding to the minute lets reruns within a minute share results
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+def _csv_bytes(df):
+    """Encode a DataFrame as UTF-8 CSV bytes, using PyArrow's writer when it can hold the frame"""
+    if pa is not None:
+        try:
+            sink = pa.BufferOutputStream()
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink)
+            return sink.getvalue().to_pybytes()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type object columns can't become an Arrow table, so pandas formats those
+            pass
+    return df.to_csv(index=False).encode("utf-8")
+
+# Text columns that usually repeat, returned as categoricals - a small code per row instead of one string object each,
+# which keeps the cached frames small to pickle, hash and send to the browser. A grouped result can have one row per
+# value (e.g. query 6's cities), so a column only converts when at least half its rows are repeats
+_CATEGORY_COLUMNS = ("Type", "City", "Status", "Food_Type", "Meal_Type", "Location", "Provider_Type")
+
+def _read_frame(conn, query, params=None, dtype=None):
+    """Run a query on a connection and build its DataFrame straight from the fetched rows"""
+    # This skips read_sql_query's wrapper layers, which dominate the cost for the small result sets used here
+    cursor = conn.execute(query, params or ())
+    df = pd.DataFrame.from_records(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+    categories = {
+        column: "category"
+        for column in _CATEGORY_COLUMNS
+        if column in df.columns and df[column].nunique() * 2 <= len(df)
+    }
+    return df.astype({**categories, **(dtype or {})}) if categories or dtype else df
+
+def _read_row(conn, query, params=None):
+    """Run a single-row query and return it as a dict of column name to value, or an empty dict if no row came back"""
+    # Metrics only need a handful of scalars, so there's no DataFrame to build at all
+    cursor = conn.execute(query, params or ())
+    row = cursor.fetchone()
+    return dict(zip([column[0] for column in cursor.description], row)) if row else {}
+
+@st.cache_data(ttl="5m", max_entries=128, show_spinner=False)
+def _cached_query(db_path, query, params, dtype=None):
+    """Run a read-only query and memoize the DataFrame by (db_path, query, params, dtype)"""
+    path = _disk_cache_path(db_path, query, params, dtype) if feather is not None else None
+    # The date-dependent queries carry the time in their params, but disk copies still expire as a safety net
+    if path and os.path.exists(path) and time.time() - os.path.getmtime(path) < _DISK_CACHE_TTL:
+        return feather.read_feather(path)
+    
+    # Reads go through the pooled read-only connections, so queries from different sessions or threads run in parallel
+    with read_connection(db_path) as conn:
+        df = _read_frame(conn, query, params, dtype)
+    
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary name first so another session never reads a half-written file
+            feather.write_feather(df, f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            _prune_disk_cache(os.path.dirname(path))
+        except (OSError, ValueError, TypeError) as e:
+            # Mixed-type columns can't be stored as Arrow - the in-memory cache still holds the result
+            print(f"Skipping disk cache for query: {e}")
+    return df
+
+@st.cache_data(ttl="10m", max_entries=16, show_spinner=False)
+def _cached_report(_queries, db_path, title, now=None):
+    """Run one analytical query by title and memoize its (DataFrame, CSV bytes) by (db_path, title, now)"""
+    # now is only set for the date-dependent reports, so the rest keep one entry for the whole ttl
+    method = getattr(_queries, dict(_queries._REPORTS)[title])
+    df = method(now=now) if now else method()
+    return df, _csv_bytes(df)
+
+@st.cache_data(ttl="2m", max_entries=4, show_spinner=False)
+def _cached_dashboard_bundle(db_path, kpi_query, queries):
+    """Run the dashboard's queries on one connection and memoize the KPI row and chart DataFrames by key"""
+    with read_connection(db_path) as conn:
+        try:
+            # One read transaction for all of them, so the KPIs and charts come from the same snapshot
+            conn.execute("BEGIN")
+            bundle = {"kpi": _read_row(conn, kpi_query)}
+            bundle.update((key, _read_frame(conn, query, dtype=dtype)) for key, query, dtype in queries)
+            return bundle
+        finally:
+            # Nothing was written, so ending the transaction just releases the snapshot
+            conn.rollback()
+
+@st.cache_data(ttl="2m", max_entries=4, show_spinner=False)
+def _cached_alerts_bundle(db_path, query, columns, now):
+    """Run the combined alerts query once and split it into one DataFrame per alert, memoized by (db_path, now)"""
+    with read_connection(db_path) as conn:
+        df = _read_frame(conn, query, (now,))
+    return {alert: df.loc[df["Alert"] == alert, list(cols)].reset_index(drop=True) for alert, cols in columns}
+
+@st.cache_data(ttl="10m", max_entries=8, show_spinner=False)
+def _cached_csv_export(db_path, query):
+    """Stream a query's rows into CSV bytes chunk by chunk and memoize them by (db_path, query)"""
+    buffer = io.BytesIO()
+    # The reader stays checked out until the last chunk is read, since the cursor stays open on it
+    with read_connection(db_path) as conn:
+        for i, chunk in enumerate(pd.read_sql_query(query, conn, chunksize=10000)):
+            chunk.to_csv(buffer, index=False, header=(i == 0), encoding="utf-8")
+    return buffer.getvalue()
 
 class SQLQueries:
+    # Dashboard queries live at class scope so dashboard_bundle can run them together on one connection
+    _QUERY_2 = '''
+        SELECT 
+            p.Type as Provider_Type,
+            SUM(fl.Quantity) as Total_Quantity,
+            COUNT(fl.Food_ID) as Total_Items,
+            ROUND(AVG(fl.Quantity), 2) as Avg_Quantity
+        FROM providers p
+        JOIN food_listings fl ON p.Provider_ID = fl.Provider_ID
+        GROUP BY p.Type
+        ORDER BY Total_Quantity DESC
+        '''
+    # The KPI totals are kept up to date by triggers in dashboard_summary, so this is three key lookups
+    _QUERY_5 = '''
+        SELECT 
+            CAST(qty.value AS INTEGER) as Total_Available_Quantity,
+            CAST(items.value AS INTEGER) as Total_Food_Items,
+            CAST(providers.value AS INTEGER) as Active_Providers,
+            ROUND(qty.value / NULLIF(items.value, 0), 2) as Avg_Quantity_Per_Item
+        FROM dashboard_summary qty, dashboard_summary items, dashboard_summary providers
+        WHERE qty.key = 'total_qty' AND items.key = 'total_items' AND providers.key = 'active_providers'
+        '''
+    _QUERY_6 = '''
+        SELECT 
+            City,
+            Total_Listings,
+            Total_Quantity,
+            ROUND(Total_Quantity * 1.0 / Total_Listings, 2) as Avg_Quantity
+        FROM mv_city_listings
+        ORDER BY Total_Listings DESC, City
+        '''
+    # The bound "now" is converted once in the now CTE and Days_Until_Expiry once per row, so the CASE reuses it.
+    # The plain Expiry_Date bound lets SQLite range-scan idx_food_expiry before the exact day count is applied
+    _QUERY_14 = '''
+        WITH now AS (SELECT julianday(?) as jd),
+        expiring AS (
+            SELECT 
+                Food_Name,
+                Quantity,
+                Expiry_Date,
+                Location,
+                Food_Type,
+                Meal_Type,
+                julianday(Expiry_Date) - now.jd as Days_Until_Expiry
+            FROM food_listings, now
+            WHERE Expiry_Date <= datetime(now.jd, '+5 days')
+        )
+        SELECT 
+            *,
+            CASE 
+                WHEN Days_Until_Expiry < 0 THEN 'Expired'
+                WHEN Days_Until_Expiry <= 1 THEN 'Critical'
+                WHEN Days_Until_Expiry <= 3 THEN 'Warning'
+                ELSE 'Safe'
+            END as Status
+        FROM expiring
+        WHERE Days_Until_Expiry <= 5
+        ORDER BY Days_Until_Expiry ASC
+        '''
+    _QUERY_15 = '''
+        SELECT 
+            fl.Food_Name,
+            fl.Quantity,
+            fl.Expiry_Date,
+            fl.Location,
+            fl.Food_Type,
+            fl.Meal_Type,
+            p.Name as Provider_Name,
+            p.Contact as Provider_Contact,
+            julianday(fl.Expiry_Date) - julianday(?) as Days_Until_Expiry
+        FROM food_listings fl
+        JOIN providers p ON fl.Provider_ID = p.Provider_ID
+        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
+        WHERE c.Food_ID IS NULL
+        ORDER BY fl.Expiry_Date ASC
+        '''
+    _QUERY_8 = '''
+        SELECT 
+            fl.Food_Name,
+            fl.Quantity as Available_Quantity,
+            fl.Location,
+            COUNT(c.Claim_ID) as Total_Claims,
+            SUM(CASE WHEN c.Status = 'Completed' THEN 1 ELSE 0 END) as Completed_Claims,
+            SUM(CASE WHEN c.Status = 'Pending' THEN 1 ELSE 0 END) as Pending_Claims,
+            SUM(CASE WHEN c.Status = 'Cancelled' THEN 1 ELSE 0 END) as Cancelled_Claims
+        FROM food_listings fl
+        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
+        GROUP BY fl.Food_ID, fl.Food_Name, fl.Quantity, fl.Location
+        ORDER BY Total_Claims DESC
+        '''
+    _QUERY_12 = '''
+        SELECT 
+            fl.Meal_Type,
+            COUNT(c.Claim_ID) as Total_Claims,
+            SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) as Quantity_Claimed,
+            SUM(fl.Quantity) as Total_Available,
+            ROUND(
+                (SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) * 100.0 / 
+                 SUM(fl.Quantity)), 2
+            ) as Claim_Rate_Percent
+        FROM food_listings fl
+        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
+        GROUP BY fl.Meal_Type
+        ORDER BY Total_Claims DESC
+        '''
+    _QUERY_13 = '''
+        SELECT 
+            p.Name,
+            p.Type,
+            p.City,
+            COUNT(fl.Food_ID) as Items_Listed,
+            SUM(fl.Quantity) as Total_Quantity_Listed,
+            SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) as Quantity_Donated,
+            ROUND(
+                (SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) * 100.0 / 
+                 NULLIF(SUM(fl.Quantity), 0)), 2
+            ) as Donation_Rate_Percent
+        FROM providers p
+        LEFT JOIN food_listings fl ON p.Provider_ID = fl.Provider_ID
+        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
+        GROUP BY p.Provider_ID, p.Name, p.Type, p.City
+        ORDER BY Quantity_Donated DESC
+        '''
+    # The reports in display order, with the method that runs each one
+    _REPORTS = (
+        ('Query 1: Providers & Receivers by City', 'query_1_providers_receivers_by_city'),
+        ('Query 2: Provider Type Contributions', 'query_2_provider_type_contribution'),
+        ('Query 4: Top Claiming Receivers', 'query_4_top_claiming_receivers'),
+        ('Query 5: Total Food Quantity', 'query_5_total_food_quantity'),
+        ('Query 6: City Food Listings', 'query_6_city_food_listings'),
+        ('Query 7: Common Food Types', 'query_7_common_food_types'),
+        ('Query 8: Claims per Food Item', 'query_8_claims_per_food_item'),
+        ('Query 9: Successful Providers', 'query_9_successful_providers'),
+        ('Query 10: Claim Status Distribution', 'query_10_claim_status_distribution'),
+        ('Query 11: Avg Quantity per Receiver', 'query_11_avg_quantity_per_receiver'),
+        ('Query 12: Popular Meal Types', 'query_12_popular_meal_types'),
+        ('Query 13: Provider Donations', 'query_13_provider_donations'),
+        ('Query 14: Expiring Food', 'query_14_expiring_food'),
+        ('Query 15: Unclaimed Food', 'query_15_unclaimed_food'),
+    )
+    REPORT_TITLES = tuple(title for title, _ in _REPORTS)
+    # The reports whose results depend on the current time
+    _TIMED_REPORTS = frozenset({'Query 14: Expiring Food', 'Query 15: Unclaimed Food'})
+    
+    # Known column types for the dashboard queries, so pandas casts each column straight to its final dtype
+    _DTYPES_2 = {"Total_Quantity": "int64", "Total_Items": "int32", "Avg_Quantity": "float64"}
+    _DTYPES_5 = {
+        "Total_Available_Quantity": "int64",
+        "Total_Food_Items": "int32",
+        "Active_Providers": "int32",
+        "Avg_Quantity_Per_Item": "float64",
+    }
+    _DTYPES_6 = {"Total_Listings": "int32", "Total_Quantity": "int64", "Avg_Quantity": "float64"}
+    # The KPIs feed st.metric directly, so query 5 comes back as a plain dict row; the charts get DataFrames
+    _DASHBOARD_QUERIES = (
+        ("city", _QUERY_6, _DTYPES_6),
+        ("provider", _QUERY_2, _DTYPES_2),
+    )
+    
+    # Expiring and unclaimed food come from one statement that shares the food_listings pass,
+    # tagged by an Alert column and padded with NULLs so both halves line up for UNION ALL
+    _ALERTS_QUERY = '''
+        WITH listings AS (
+            SELECT 
+                Food_ID,
+                Food_Name,
+                Quantity,
+                Expiry_Date,
+                Location,
+                Food_Type,
+                Meal_Type,
+                Provider_ID,
+                julianday(Expiry_Date) - julianday(?) as Days_Until_Expiry
+            FROM food_listings
+        ),
+        alerts AS (
+            SELECT 
+                'expiring' as Alert,
+                Food_Name, Quantity, Expiry_Date, Location, Food_Type, Meal_Type, Days_Until_Expiry,
+                CASE 
+                    WHEN Days_Until_Expiry < 0 THEN 'Expired'
+                    WHEN Days_Until_Expiry <= 1 THEN 'Critical'
+                    WHEN Days_Until_Expiry <= 3 THEN 'Warning'
+                    ELSE 'Safe'
+                END as Status,
+                NULL as Provider_Name,
+                NULL as Provider_Contact
+            FROM listings
+            WHERE Days_Until_Expiry <= 5
+            UNION ALL
+            SELECT 
+                'unclaimed',
+                l.Food_Name, l.Quantity, l.Expiry_Date, l.Location, l.Food_Type, l.Meal_Type, l.Days_Until_Expiry,
+                NULL,
+                p.Name,
+                p.Contact
+            FROM listings l
+            JOIN providers p ON l.Provider_ID = p.Provider_ID
+            LEFT JOIN claims c ON l.Food_ID = c.Food_ID
+            WHERE c.Food_ID IS NULL
+        )
+        SELECT * FROM alerts
+        ORDER BY Alert, CASE WHEN Alert = 'expiring' THEN Days_Until_Expiry END, Expiry_Date
+        '''
+    _ALERT_COLUMNS = (
+        ("expiring", ("Food_Name", "Quantity", "Expiry_Date", "Location", "Food_Type", "Meal_Type",
+                      "Days_Until_Expiry", "Status")),
+        ("unclaimed", ("Food_Name", "Quantity", "Expiry_Date", "Location", "Food_Type", "Meal_Type",
+                       "Provider_Name", "Provider_Contact", "Days_Until_Expiry")),
+    )
+    
     def __init__(self, db_path="database/food_waste.db"):
         self.db_path = db_path
     
-    def execute_query(self, query, params=None):
-        """Execute a SQL query and return results as DataFrame"""
+    def execute_query(self, query, params=None, dtype=None):
+        """Execute a SQL query and return results as DataFrame, optionally casting columns to the given dtypes"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            if params:
-                df = pd.read_sql_query(query, conn, params=params)
-            else:
-                df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
+            # Params are passed as a tuple so they can be part of the cache key
+            return _cached_query(self.db_path, query, tuple(params) if params else None, dtype)
         except Exception as e:
             print(f"Error executing query: {e}")
             return pd.DataFrame()
     
+    def clear_cache(self):
+        """Drop cached query results - call this after any write to the database"""
+        _cached_query.clear()
+        _cached_report.clear()
+        _cached_csv_export.clear()
+        _cached_dashboard_bundle.clear()
+        _cached_alerts_bundle.clear()
+        shutil.rmtree(_disk_cache_dir(self.db_path), ignore_errors=True)
+    
+    def export_query_csv(self, query):
+        """Return a query's full result as CSV bytes without building one large DataFrame"""
+        try:
+            return _cached_csv_export(self.db_path, query)
+        except Exception as e:
+            print(f"Error exporting query: {e}")
+            return b""
+    
     def query_1_providers_receivers_by_city(self):
         """1. How many food providers and receivers are there in each city?"""
         query = '''
@@ -41,18 +408,7 @@ class SQLQueries:
     
     def query_2_provider_type_contribution(self):
         """2. Which type of food provider contributes the most food?"""
-        query = '''
-        SELECT 
-            p.Type as Provider_Type,
-            SUM(fl.Quantity) as Total_Quantity,
-            COUNT(fl.Food_ID) as Total_Items,
-            ROUND(AVG(fl.Quantity), 2) as Avg_Quantity
-        FROM providers p
-        JOIN food_listings fl ON p.Provider_ID = fl.Provider_ID
-        GROUP BY p.Type
-        ORDER BY Total_Quantity DESC
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_2, dtype=self._DTYPES_2)
     
     def query_3_provider_contacts_by_city(self, city):
         """3. Contact information of food providers in a specific city"""
@@ -84,65 +440,34 @@ class SQLQueries:
     
     def query_5_total_food_quantity(self):
         """5. Total quantity of food available from all providers"""
-        query = '''
-        SELECT 
-            SUM(Quantity) as Total_Available_Quantity,
-            COUNT(Food_ID) as Total_Food_Items,
-            COUNT(DISTINCT Provider_ID) as Active_Providers,
-            ROUND(AVG(Quantity), 2) as Avg_Quantity_Per_Item
-        FROM food_listings
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_5, dtype=self._DTYPES_5)
     
     def query_6_city_food_listings(self):
         """6. Which city has the highest number of food listings?"""
-        query = '''
-        SELECT 
-            Location as City,
-            COUNT(Food_ID) as Total_Listings,
-            SUM(Quantity) as Total_Quantity,
-            ROUND(AVG(Quantity), 2) as Avg_Quantity
-        FROM food_listings
-        GROUP BY Location
-        ORDER BY Total_Listings DESC
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_6, dtype=self._DTYPES_6)
     
     def query_7_common_food_types(self):
         """7. What are the most commonly available food types?"""
         query = '''
         SELECT 
             Food_Type,
-            COUNT(Food_ID) as Total_Items,
-            SUM(Quantity) as Total_Quantity,
-            ROUND(AVG(Quantity), 2) as Avg_Quantity,
-            ROUND((COUNT(Food_ID) * 100.0 / (SELECT COUNT(*) FROM food_listings)), 2) as Percentage
-        FROM food_listings
-        GROUP BY Food_Type
+            Total_Items,
+            Total_Quantity,
+            ROUND(Total_Quantity * 1.0 / Total_Items, 2) as Avg_Quantity,
+            ROUND(Total_Items * 100.0 / SUM(Total_Items) OVER (), 2) as Percentage
+        FROM mv_food_type_counts
         ORDER BY Total_Quantity DESC
         '''
         return self.execute_query(query)
     
     def query_8_claims_per_food_item(self):
         """8. How many food claims have been made for each food item?"""
-        query = '''
-        SELECT 
-            fl.Food_Name,
-            fl.Quantity as Available_Quantity,
-            fl.Location,
-            COUNT(c.Claim_ID) as Total_Claims,
-            SUM(CASE WHEN c.Status = 'Completed' THEN 1 ELSE 0 END) as Completed_Claims,
-            SUM(CASE WHEN c.Status = 'Pending' THEN 1 ELSE 0 END) as Pending_Claims,
-            SUM(CASE WHEN c.Status = 'Cancelled' THEN 1 ELSE 0 END) as Cancelled_Claims
-        FROM food_listings fl
-        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
-        GROUP BY fl.Food_ID, fl.Food_Name, fl.Quantity, fl.Location
-        ORDER BY Total_Claims DESC
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_8)
     
     def query_9_successful_providers(self):
         """9. Which provider has had the highest number of successful food claims?"""
+        # Only claimed listings count here, so claims is an inner join - the planner can drive the join from claims
+        # and look listings and providers up by primary key, instead of producing unclaimed rows and filtering them
         query = '''
         SELECT 
             p.Name,
@@ -156,8 +481,7 @@ class SQLQueries:
             ) as Success_Rate_Percent
         FROM providers p
         JOIN food_listings fl ON p.Provider_ID = fl.Provider_ID
-        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
-        WHERE c.Claim_ID IS NOT NULL
+        JOIN claims c ON fl.Food_ID = c.Food_ID
         GROUP BY p.Provider_ID, p.Name, p.Type, p.City
         ORDER BY Successful_Claims DESC
         '''
@@ -168,10 +492,9 @@ class SQLQueries:
         query = '''
         SELECT 
             Status,
-            COUNT(*) as Count,
-            ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims)), 2) as Percentage
-        FROM claims
-        GROUP BY Status
+            Count,
+            ROUND(Count * 100.0 / SUM(Count) OVER (), 2) as Percentage
+        FROM mv_status_counts
         ORDER BY Count DESC
         '''
         return self.execute_query(query)
@@ -199,106 +522,38 @@ class SQLQueries:
     
     def query_12_popular_meal_types(self):
         """12. Which meal type is claimed the most?"""
-        query = '''
-        SELECT 
-            fl.Meal_Type,
-            COUNT(c.Claim_ID) as Total_Claims,
-            SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) as Quantity_Claimed,
-            SUM(fl.Quantity) as Total_Available,
-            ROUND(
-                (SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) * 100.0 / 
-                 SUM(fl.Quantity)), 2
-            ) as Claim_Rate_Percent
-        FROM food_listings fl
-        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
-        GROUP BY fl.Meal_Type
-        ORDER BY Total_Claims DESC
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_12)
     
     def query_13_provider_donations(self):
         """13. What is the total quantity of food donated by each provider?"""
-        query = '''
-        SELECT 
-            p.Name,
-            p.Type,
-            p.City,
-            COUNT(fl.Food_ID) as Items_Listed,
-            SUM(fl.Quantity) as Total_Quantity_Listed,
-            SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) as Quantity_Donated,
-            ROUND(
-                (SUM(CASE WHEN c.Status = 'Completed' THEN fl.Quantity ELSE 0 END) * 100.0 / 
-                 NULLIF(SUM(fl.Quantity), 0)), 2
-            ) as Donation_Rate_Percent
-        FROM providers p
-        LEFT JOIN food_listings fl ON p.Provider_ID = fl.Provider_ID
-        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
-        GROUP BY p.Provider_ID, p.Name, p.Type, p.City
-        ORDER BY Quantity_Donated DESC
-        '''
-        return self.execute_query(query)
+        return self.execute_query(self._QUERY_13)
     
-    def query_14_expiring_food(self):
-        """14. Which food items are expiring soon?"""
-        query = '''
-        SELECT 
-            Food_Name,
-            Quantity,
-            Expiry_Date,
-            Location,
-            Food_Type,
-            Meal_Type,
-            julianday(Expiry_Date) - julianday('now') as Days_Until_Expiry,
-            CASE 
-                WHEN julianday(Expiry_Date) - julianday('now') < 0 THEN 'Expired'
-                WHEN julianday(Expiry_Date) - julianday('now') <= 1 THEN 'Critical'
-                WHEN julianday(Expiry_Date) - julianday('now') <= 3 THEN 'Warning'
-                ELSE 'Safe'
-            END as Status
-        FROM food_listings
-        WHERE julianday(Expiry_Date) - julianday('now') <= 5
-        ORDER BY Days_Until_Expiry ASC
-        '''
-        return self.execute_query(query)
+    def query_14_expiring_food(self, now=None):
+        """14. Which food items are expiring soon? now defaults to the current UTC minute"""
+        return self.execute_query(self._QUERY_14, (now or _utc_minute(),))
     
-    def query_15_unclaimed_food(self):
-        """15. What food items have not been claimed yet?"""
-        query = '''
-        SELECT 
-            fl.Food_Name,
-            fl.Quantity,
-            fl.Expiry_Date,
-            fl.Location,
-            fl.Food_Type,
-            fl.Meal_Type,
-            p.Name as Provider_Name,
-            p.Contact as Provider_Contact,
-            julianday(fl.Expiry_Date) - julianday('now') as Days_Until_Expiry
-        FROM food_listings fl
-        JOIN providers p ON fl.Provider_ID = p.Provider_ID
-        LEFT JOIN claims c ON fl.Food_ID = c.Food_ID
-        WHERE c.Food_ID IS NULL
-        ORDER BY fl.Expiry_Date ASC
-        '''
-        return self.execute_query(query)
+    def query_15_unclaimed_food(self, now=None):
+        """15. What food items have not been claimed yet? now defaults to the current UTC minute"""
+        return self.execute_query(self._QUERY_15, (now or _utc_minute(),))
 
-    def get_all_queries_results(self):
-        """Get results from all 15 queries"""
-        results = {}
-        
-        results['Query 1: Providers & Receivers by City'] = self.query_1_providers_receivers_by_city()
-        results['Query 2: Provider Type Contributions'] = self.query_2_provider_type_contribution()
-        results['Query 4: Top Claiming Receivers'] = self.query_4_top_claiming_receivers()
-        results['Query 5: Total Food Quantity'] = self.query_5_total_food_quantity()
-        results['Query 6: City Food Listings'] = self.query_6_city_food_listings()
-        results['Query 7: Common Food Types'] = self.query_7_common_food_types()
-        results['Query 8: Claims per Food Item'] = self.query_8_claims_per_food_item()
-        results['Query 9: Successful Providers'] = self.query_9_successful_providers()
-        results['Query 10: Claim Status Distribution'] = self.query_10_claim_status_distribution()
-        results['Query 11: Avg Quantity per Receiver'] = self.query_11_avg_quantity_per_receiver()
-        results['Query 12: Popular Meal Types'] = self.query_12_popular_meal_types()
-        results['Query 13: Provider Donations'] = self.query_13_provider_donations()
-        results['Query 14: Expiring Food'] = self.query_14_expiring_food()
-        results['Query 15: Unclaimed Food'] = self.query_15_unclaimed_food()
-        
-        return results
\ No newline at end of file
+    def dashboard_bundle(self):
+        """Get the home dashboard's KPI row (a dict) and chart DataFrames in one batch, keyed by kpi/city/provider"""
+        try:
+            return _cached_dashboard_bundle(self.db_path, self._QUERY_5, self._DASHBOARD_QUERIES)
+        except Exception as e:
+            print(f"Error loading dashboard: {e}")
+            return {"kpi": {}, **{key: pd.DataFrame() for key, *_ in self._DASHBOARD_QUERIES}}
+    
+    def alerts_bundle(self):
+        """Get expiring and unclaimed food from one combined query, keyed by expiring/unclaimed"""
+        try:
+            return _cached_alerts_bundle(self.db_path, self._ALERTS_QUERY, self._ALERT_COLUMNS, _utc_minute())
+        except Exception as e:
+            print(f"Error loading alerts: {e}")
+            return {alert: pd.DataFrame() for alert, _ in self._ALERT_COLUMNS}
+    
+    def get_query_result(self, title):
+        """Get one report's (DataFrame, CSV bytes) by its title, running only that query"""
+        # The time is taken once here and passed in, so it's part of the cache key for the date-dependent reports
+        now = _utc_minute() if title in self._TIMED_REPORTS else None
+        return _cached_report(self, self.db_path, title, now)
\ No newline at end of file